@@ -1,7 +1,9 @@
 # author_persona_discovery.py
 import streamlit as st
 import pandas as pd
+import itertools
 from enum import Enum
+from image_cache import ImageCache
 
 class AuthorType(Enum):
     SHADOW = "The Shadow"
@@ -55,6 +57,128 @@ class AuthorPersona:
         else:
             return AuthorType.OPEN_BOOK
 
+# Answer → outcome tables shared by the catalog and the quiz
+ANSWER_LETTERS = ['A', 'B', 'C', 'D']
+
+INTERACTION_STYLES = {
+    'A': InteractionStyle.WRITTEN,
+    'B': InteractionStyle.AUDIO,
+    'C': InteractionStyle.VISUAL,
+    'D': InteractionStyle.LIVE
+}
+
+SOCIAL_BATTERY_OPTIONS = {
+    "Completely drained (need alone time)": SocialBattery.LOW,
+    "Moderately tired (can do more but need break)": SocialBattery.LOW,
+    "Balanced (could go either way)": SocialBattery.MEDIUM,
+    "Energized (ready for more!)": SocialBattery.MEDIUM,
+    "Fully charged (this fuels me)": SocialBattery.HIGH
+}
+
+TYPE_ICONS = {
+    AuthorType.SHADOW: "🖤",
+    AuthorType.CURATED: "💎",
+    AuthorType.BRIDGE: "🌉",
+    AuthorType.OPEN_BOOK: "📖"
+}
+
+# Personalized recommendations based on author type
+RECOMMENDATIONS = {
+    AuthorType.SHADOW: """
+    - **Focus on:** Written content, newsletters, blog posts
+    - **Platform:** Start with Medium, Substack, or anonymous Twitter
+    - **Avoid:** Live video, in-person events initially
+    - **Growth strategy:** Let your writing be your voice
+    """,
+    
+    AuthorType.CURATED: """
+    - **Focus on:** Professional branding, scheduled content, edited videos
+    - **Platform:** LinkedIn, YouTube (edited), professional website
+    - **Avoid:** Impromptu live streams, unplanned appearances
+    - **Growth strategy:** Quality over quantity, planned engagement
+    """,
+    
+    AuthorType.BRIDGE: """
+    - **Focus on:** Mix of content types, podcast appearances, interviews
+    - **Platform:** Instagram, Twitter, occasional live events
+    - **Avoid:** Overcommitting to one format
+    - **Growth strategy:** Leverage both written and visual content
+    """,
+    
+    AuthorType.OPEN_BOOK: """
+    - **Focus on:** Live videos, events, community building
+    - **Platform:** TikTok, Instagram Live, Clubhouse, speaking events
+    - **Avoid:** Hiding behind curated content
+    - **Growth strategy:** Your personality is your brand—lean into it
+    """
+}
+
+# Interaction style tips
+STYLE_TIPS = {
+    InteractionStyle.WRITTEN: "Start a newsletter—it's your superpower.",
+    InteractionStyle.AUDIO: "Launch a podcast or seek guest spots.",
+    InteractionStyle.VISUAL: "YouTube and TikTok are your playground.",
+    InteractionStyle.LIVE: "Seek speaking opportunities and live events."
+}
+
+PLAN_PLATFORMS = {
+    InteractionStyle.WRITTEN: 'Substack/Medium',
+    InteractionStyle.VISUAL: 'YouTube/TikTok',
+    InteractionStyle.AUDIO: 'Podcast setup',
+    InteractionStyle.LIVE: 'Event booking'
+}
+
+PLAN_FIRST_CONTENT = {
+    InteractionStyle.WRITTEN: 'newsletter',
+    InteractionStyle.VISUAL: 'video',
+    InteractionStyle.AUDIO: 'podcast episode',
+    InteractionStyle.LIVE: 'small event'
+}
+
+def build_outcome(q1, q2, q3, q4, q5):
+    """Everything the results page shows for one combination of Q1–Q5"""
+    persona = AuthorPersona()
+    visibility_score = persona.calculate_visibility({'q1': q1, 'q2': q2, 'q3': q3})
+    author_type = persona.get_author_type()
+    interaction_style = INTERACTION_STYLES[q4]
+    
+    return {
+        'author_type': author_type,
+        'visibility_score': visibility_score,
+        'icon': TYPE_ICONS[author_type],
+        'interaction_style': interaction_style,
+        'social_battery': SOCIAL_BATTERY_OPTIONS[q5],
+        'recommendations': RECOMMENDATIONS[author_type],
+        'tip': STYLE_TIPS[interaction_style],
+        'plan': f"""
+            **Week 1-2: Foundation**
+            - Set up your primary platform ({PLAN_PLATFORMS[interaction_style]})
+            - Create your bio and consistent branding
+            - Prepare 5 pieces of content
+            
+            **Week 3-4: Engagement**
+            - Begin posting consistently
+            - Engage with 5 other authors daily
+            - Schedule your first {PLAN_FIRST_CONTENT[interaction_style]}
+            """
+    }
+
+def compile_outcome_catalog():
+    """Outcomes for every possible Q1–Q5 answer (4 × 4 × 4 × 4 × 5 combinations)"""
+    return {
+        answers: build_outcome(*answers)
+        for answers in itertools.product(ANSWER_LETTERS, ANSWER_LETTERS, ANSWER_LETTERS,
+                                         ANSWER_LETTERS, SOCIAL_BATTERY_OPTIONS)
+    }
+
+@st.cache_resource
+def get_persona_outcome_catalog():
+    """The outcome catalog, compiled once per process rather than on every rerun"""
+    return compile_outcome_catalog()
+
+def lookup_outcome(answers):
+    return get_persona_outcome_catalog()[tuple(answers[q] for q in ['q1', 'q2', 'q3', 'q4', 'q5'])]
+
 def render_quiz():
     """Main function to render the Streamlit quiz interface"""
     
@@ -134,13 +258,7 @@ def render_quiz():
             
             q5 = st.select_slider(
                 "**Q5: Your social battery after 2 hours of engaging with readers:**",
-                options=[
-                    "Completely drained (need alone time)",
-                    "Moderately tired (can do more but need break)",
-                    "Balanced (could go either way)",
-                    "Energized (ready for more!)",
-                    "Fully charged (this fuels me)"
-                ],
+                options=list(SOCIAL_BATTERY_OPTIONS),
                 value=None,
                 key="q5"
             )
@@ -208,29 +326,12 @@ def render_quiz():
 def render_results():
     """Display quiz results with author type and recommendations"""
     
-    # Create persona and calculate results
-    persona = AuthorPersona()
-    visibility_score = persona.calculate_visibility(st.session_state.answers)
-    author_type = persona.get_author_type()
-    
-    # Determine interaction style from Q4
-    q4_map = {
-        'A': InteractionStyle.WRITTEN,
-        'B': InteractionStyle.AUDIO,
-        'C': InteractionStyle.VISUAL,
-        'D': InteractionStyle.LIVE
-    }
-    interaction_style = q4_map[st.session_state.answers['q4']]
-    
-    # Determine social battery from Q5
-    q5_map = {
-        "Completely drained (need alone time)": SocialBattery.LOW,
-        "Moderately tired (can do more but need break)": SocialBattery.LOW,
-        "Balanced (could go either way)": SocialBattery.MEDIUM,
-        "Energized (ready for more!)": SocialBattery.MEDIUM,
-        "Fully charged (this fuels me)": SocialBattery.HIGH
-    }
-    social_battery = q5_map[st.session_state.answers['q5']]
+    # One lookup into the precompiled outcome catalog
+    outcome = lookup_outcome(st.session_state.answers)
+    author_type = outcome['author_type']
+    visibility_score = outcome['visibility_score']
+    interaction_style = outcome['interaction_style']
+    social_battery = outcome['social_battery']
     
     # Display results in a beautiful layout
     st.balloons()
@@ -239,17 +340,9 @@ def render_results():
     # Author Type Badge
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
-        # Type-specific styling
-        type_colors = {
-            AuthorType.SHADOW: "🖤",
-            AuthorType.CURATED: "💎",
-            AuthorType.BRIDGE: "🌉",
-            AuthorType.OPEN_BOOK: "📖"
-        }
-        
         st.markdown(f"""
         <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 20px; color: white;">
-            <h1 style="font-size: 4rem; margin: 0;">{type_colors[author_type]}</h1>
+            <h1 style="font-size: 4rem; margin: 0;">{outcome['icon']}</h1>
             <h2 style="margin: 0.5rem 0;">{author_type.value}</h2>
             <p style="opacity: 0.9;">Visibility Score: {visibility_score:.1f}/4.0</p>
         </div>
@@ -273,48 +366,10 @@ def render_results():
     with col2:
         st.markdown("### 🎯 Recommended Path")
         
-        # Personalized recommendations based on author type
-        recommendations = {
-            AuthorType.SHADOW: """
-            - **Focus on:** Written content, newsletters, blog posts
-            - **Platform:** Start with Medium, Substack, or anonymous Twitter
-            - **Avoid:** Live video, in-person events initially
-            - **Growth strategy:** Let your writing be your voice
-            """,
-            
-            AuthorType.CURATED: """
-            - **Focus on:** Professional branding, scheduled content, edited videos
-            - **Platform:** LinkedIn, YouTube (edited), professional website
-            - **Avoid:** Impromptu live streams, unplanned appearances
-            - **Growth strategy:** Quality over quantity, planned engagement
-            """,
-            
-            AuthorType.BRIDGE: """
-            - **Focus on:** Mix of content types, podcast appearances, interviews
-            - **Platform:** Instagram, Twitter, occasional live events
-            - **Avoid:** Overcommitting to one format
-            - **Growth strategy:** Leverage both written and visual content
-            """,
-            
-            AuthorType.OPEN_BOOK: """
-            - **Focus on:** Live videos, events, community building
-            - **Platform:** TikTok, Instagram Live, Clubhouse, speaking events
-            - **Avoid:** Hiding behind curated content
-            - **Growth strategy:** Your personality is your brand—lean into it
-            """
-        }
-        
-        st.markdown(recommendations[author_type])
+        st.markdown(outcome['recommendations'])
         
-        # Interaction style tips
         st.markdown("**💡 Quick Tip:**")
-        style_tips = {
-            InteractionStyle.WRITTEN: "Start a newsletter—it's your superpower.",
-            InteractionStyle.AUDIO: "Launch a podcast or seek guest spots.",
-            InteractionStyle.VISUAL: "YouTube and TikTok are your playground.",
-            InteractionStyle.LIVE: "Seek speaking opportunities and live events."
-        }
-        st.info(style_tips[interaction_style])
+        st.info(outcome['tip'])
     
     # Next steps
     st.markdown("---")
@@ -325,17 +380,7 @@ def render_results():
     
     if st.session_state.get('show_strategy', False):
         with st.expander("Your 30-Day Platform Launch Plan", expanded=True):
-            st.markdown(f"""
-            **Week 1-2: Foundation**
-            - Set up your primary platform ({'Substack/Medium' if interaction_style == InteractionStyle.WRITTEN else 'YouTube/TikTok' if interaction_style == InteractionStyle.VISUAL else 'Podcast setup' if interaction_style == InteractionStyle.AUDIO else 'Event booking'})
-            - Create your bio and consistent branding
-            - Prepare 5 pieces of content
-            
-            **Week 3-4: Engagement**
-            - Begin posting consistently
-            - Engage with 5 other authors daily
-            - Schedule your first {'newsletter' if interaction_style == InteractionStyle.WRITTEN else 'video' if interaction_style == InteractionStyle.VISUAL else 'podcast episode' if interaction_style == InteractionStyle.AUDIO else 'small event'}
-            """)
+            st.markdown(outcome['plan'])
     
     # Reset option
     if st.button("Take Quiz Again"):
@@ -344,6 +389,13 @@ def render_results():
                 del st.session_state[key]
         st.rerun()
 
+SIDEBAR_IMAGE_URL = "https://via.placeholder.com/150x150.png?text=📚"
+
+@st.cache_resource
+def get_image_cache():
+    """Local image cache shared by all sessions"""
+    return ImageCache()
+
 def main():
     """Main app controller"""
     st.set_page_config(
@@ -354,7 +406,13 @@ def main():
     
     # Sidebar with progress
     with st.sidebar:
-        st.image("https://via.placeholder.com/150x150.png?text=📚", width=150)
+        # Served from the local image cache; the first visit downloads it in
+        # the background, and offline the sidebar simply goes without
+        sidebar_image = get_image_cache().path_for(SIDEBAR_IMAGE_URL)
+        if sidebar_image:
+            st.image(sidebar_image, width=150)
+        else:
+            get_image_cache().prefetch_async([SIDEBAR_IMAGE_URL])
         st.markdown("### Your Journey")
         
         if not st.session_state.get('quiz_started', False):
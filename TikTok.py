@@ -3,12 +3,32 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+from scipy import sparse
 import json
 import os
+import re
+import io
+import zipfile
+import tempfile
+import shutil
+import textwrap
+import itertools
+import codecs
+import hashlib
+import heapq
+import sqlite3
+import pickle
+import functools
+import contextlib
+import collections
+import time
+import threading
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
 from enum import Enum
+from image_cache import ImageCache
 
 # ============================================================================
 # CONFIGURATION
@@ -72,67 +92,742 @@ class AuthorPersona:
         else:
             return AuthorType.OPEN_BOOK
 
+# ============================================================================
+# SHARED CACHE
+# ============================================================================
+
+# A directory path (shared volume) or a redis:// URL reachable by every replica
+CACHE_URL = os.environ.get('BOOKTOK_CACHE_URL', '.cache/booktok')
+CACHE_MAX_BYTES = int(os.environ.get('BOOKTOK_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+CACHE_DEFAULT_TTL = 24 * 3600
+# Eviction trims to this fraction of max_bytes so directory walks stay rare
+CACHE_EVICT_TARGET = 0.9
+# Bump when the shape or meaning of any cached value changes, so old entries are ignored
+CACHE_VERSION = 3
+
+# The script re-executes on every rerun while the cache backend outlives it,
+# so callers pass their own sentinel to get() rather than sharing one
+MISSING = object()
+
+class DiskCache:
+    """Pickled values in a directory shared by all replicas
+    
+    Entries carry their expiry time; reads touch the file's mtime so the
+    least recently used files are evicted first once the directory grows
+    past `max_bytes`. The size is tracked from this process's writes between
+    walks, so the directory is only walked when it is likely over the limit.
+    Writes go through a temp file and os.replace, so concurrent replicas
+    never see a partial entry.
+    """
+    
+    def __init__(self, directory, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:] + '.pkl')
+    
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError):
+            # AttributeError/ImportError: pickled by an entry point whose
+            # classes live elsewhere (__main__ vs. an imported TikTok)
+            return default
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+    
+    def set(self, key, value, ttl=CACHE_DEFAULT_TTL):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        expires_at = time.time() + ttl if ttl else None
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        # Overwrites count in full, so the estimate errs towards walking early
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            over = self._size is None or self._size > self.max_bytes
+        if over:
+            self.evict()
+    
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+    
+    def evict(self):
+        """Drop least recently used entries once the cache passes max_bytes"""
+        entries, total = [], 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.pkl'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                total += stat.st_size
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * CACHE_EVICT_TARGET:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+        with self._lock:
+            self._size = total
+
+class RedisCache:
+    """Pickled values in a Redis-protocol server (Redis, Valkey, KeyDB, ...)
+    
+    TTL uses SET EX; LRU eviction is the server's job (configure
+    `maxmemory-policy allkeys-lru`). Any client with get/set/delete can be
+    passed in, e.g. a fakeredis instance as a local stand-in.
+    """
+    
+    def __init__(self, url=None, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+    
+    def get(self, key, default=None):
+        try:
+            data = self.client.get(key)
+        except Exception:
+            # An unreachable cache must never take the app down
+            return default
+        if data is None:
+            return default
+        try:
+            return pickle.loads(data)
+        except (pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+            return default
+    
+    def set(self, key, value, ttl=CACHE_DEFAULT_TTL):
+        try:
+            self.client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl or None)
+        except Exception:
+            pass
+    
+    def delete(self, key):
+        try:
+            self.client.delete(key)
+        except Exception:
+            pass
+
+@st.cache_resource
+def get_shared_cache(url=CACHE_URL):
+    """The cache backend named by BOOKTOK_CACHE_URL"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCache(url)
+    return DiskCache(url)
+
+def cache_key(namespace, *parts):
+    """Versioned key for a namespace and the arguments that produced the value"""
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+    return f"booktok:v{CACHE_VERSION}:{namespace}:{digest}"
+
+def shared_cached(namespace, ttl=CACHE_DEFAULT_TTL, ignore=()):
+    """Memoize a function in the shared cache, so one replica's work warms all of them
+    
+    Arguments must have a stable repr (paths, file identities, strings);
+    pass a file identity rather than relying on TTL when the input is a file.
+    Keyword arguments named in `ignore` (callbacks) are left out of the key.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_shared_cache()
+            key = cache_key(namespace, args, sorted((k, v) for k, v in kwargs.items() if k not in ignore))
+            value = cache.get(key, MISSING)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
+
 # ============================================================================
 # ARC READER DATABASE LOADER
 # ============================================================================
 
-@st.cache_data
-def load_arc_readers(json_path="arc_readers.json"):
-    """Load and parse the ARC reader JSON from Apify"""
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+RELOAD_POLL_SECONDS = 5
+INGEST_BATCH_SIZE = 5000
+
+def file_identity(path):
+    """(mtime, size) fingerprint of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+SCRAPE_CHUNK_BYTES = 1 << 20
+SCRAPE_SEPARATORS = re.compile(r'[\s,\[]*')
+
+def iter_scrape_items(path, offset=0, chunk_size=SCRAPE_CHUNK_BYTES):
+    """Stream items from an Apify dump (JSON array or JSON lines) without loading it whole
     
-    # If you have the JSON file, load it
-    if os.path.exists(json_path):
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-        
-        # Extract relevant fields from each video/creator
-        readers = []
-        for item in data:
-            author = item.get('authorMeta', {})
-            stats = item.get('videoMeta', {})
-            
-            # Extract email from bio if present
-            bio = author.get('signature', '')
-            import re
-            email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-            emails = re.findall(email_pattern, bio)
-            email = emails[0] if emails else None
+    Yields (item, byte offset just past the item), so a later call can
+    resume from any yielded offset.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        buffer, pos, eof = '', 0, False
+        while True:
+            # Separators are ASCII, so characters skipped == bytes skipped
+            skip = SCRAPE_SEPARATORS.match(buffer, pos).end()
+            offset += skip - pos
+            pos = skip
+            if buffer.startswith(']', pos):
+                return
+            if pos < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    offset += len(buffer[pos:end].encode('utf-8'))
+                    pos = end
+                    yield item, offset
+                    continue
+            elif eof:
+                return
             
-            # Extract genres from hashtags
-            hashtags = [h.get('name', '') for h in item.get('hashtags', []) if h.get('name')]
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+def reader_from_item(item):
+    """Reader record for one scraped video's creator, or None without a username"""
+    author = item.get('authorMeta', {})
+    if not author.get('name'):
+        return None
+    
+    # Extract email from bio if present
+    bio = author.get('signature', '')
+    emails = EMAIL_PATTERN.findall(bio)
+    email = emails[0] if emails else None
+    
+    # Extract genres from hashtags
+    hashtags = [h.get('name', '') for h in item.get('hashtags', []) if h.get('name')]
+    
+    return {
+        'username': author.get('name', ''),
+        'display_name': author.get('nickName', ''),
+        'bio': bio,
+        'followers': author.get('fans', 0),
+        'following': author.get('following', 0),
+        'videos': author.get('video', 0),
+        'hearts': author.get('heart', 0),
+        'email': email,
+        'hashtags': hashtags,
+        'engagement': {
+            'avg_likes': item.get('diggCount', 0),
+            'avg_comments': item.get('commentCount', 0),
+            'avg_shares': item.get('shareCount', 0),
+            'views': item.get('playCount', 0)
+        },
+        'sound': sound_name(item),
+        'avatar': author.get('avatar', ''),
+        'profile_url': author.get('profileUrl', '')
+    }
+
+# "#duet with @name" / "#stitch with @name", as TikTok writes them into captions
+DUET_STITCH_PATTERN = re.compile(r'#(duet|stitch)\s+with\s+@([\w.]+)', re.IGNORECASE)
+
+def interaction_edges(item):
+    """(video, source, target, kind) for each creator a scraped video points its audience at"""
+    source = item.get('authorMeta', {}).get('name')
+    if not source:
+        return []
+    targets = {}
+    for name in item.get('mentions') or []:
+        if isinstance(name, str):
+            targets.setdefault(name.lstrip('@'), 'mention')
+    for mention in item.get('detailedMentions') or []:
+        if isinstance(mention, dict) and mention.get('name'):
+            targets.setdefault(mention['name'].lstrip('@'), 'mention')
+    for kind, name in DUET_STITCH_PATTERN.findall(item.get('text') or ''):
+        targets[name.rstrip('.')] = kind.lower()
+    if not targets:
+        return []
+    
+    video = item.get('id') or item.get('webVideoUrl')
+    if not video:
+        key = f"{source}\0{item.get('createTime')}\0{item.get('text')}"
+        video = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return [(str(video), source, target, kind) for target, kind in targets.items()
+            if target and target != source]
+
+def reader_db_path(json_path):
+    return os.path.splitext(json_path)[0] + '.db'
+
+def open_reader_db(db_path):
+    """Connect to the reader database, creating the tables on first use"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    new_sounds = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sounds'").fetchone()
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS readers (
+            username TEXT PRIMARY KEY,
+            record TEXT NOT NULL,
+            record_hash TEXT NOT NULL,
+            source TEXT NOT NULL,
+            first_seen TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            created_seq INTEGER,
+            changed_seq INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS readers_updated_at ON readers (updated_at);
+        CREATE INDEX IF NOT EXISTS readers_first_seen ON readers (first_seen);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            source TEXT PRIMARY KEY,
+            byte_offset INTEGER NOT NULL,
+            items INTEGER NOT NULL,
+            complete INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS edges (
+            video TEXT NOT NULL,
+            source TEXT NOT NULL,
+            target TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            PRIMARY KEY (video, target)
+        );
+        CREATE TABLE IF NOT EXISTS sounds (
+            name TEXT PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            consumer TEXT NOT NULL,
+            basis TEXT NOT NULL,
+            watermark TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            exported_at TEXT NOT NULL,
+            sequence INTEGER,
+            PRIMARY KEY (consumer, basis)
+        );
+    ''')
+    if not conn.execute("SELECT 1 FROM counters WHERE name = 'change_seq'").fetchone():
+        add_change_sequence(conn)
+    if new_sounds:
+        # Databases from before the sounds table only kept each reader's first sound
+        with conn:
+            conn.execute('''
+                INSERT OR IGNORE INTO sounds (name)
+                SELECT DISTINCT json_extract(record, '$.sound') FROM readers
+                WHERE json_extract(record, '$.sound') IS NOT NULL
+            ''')
+    return conn
+
+def add_change_sequence(conn):
+    """Number existing readers in timestamp order and start the change counter
+    
+    Databases from before change sequences get created_seq/changed_seq in
+    first_seen/updated_at order, and export watermarks (then timestamps)
+    become the matching sequence numbers.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if conn.execute("SELECT 1 FROM counters WHERE name = 'change_seq'").fetchone():
+            conn.rollback()
+            return
+        for table, column in [('readers', 'created_seq'), ('readers', 'changed_seq'),
+                              ('export_watermarks', 'sequence')]:
+            if column not in {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} INTEGER')
+        for basis, column in DELTA_SEQUENCES.items():
+            conn.execute(f'''
+                UPDATE readers SET {column} = ranked.seq
+                FROM (SELECT rowid AS id, ROW_NUMBER() OVER (ORDER BY {basis}, rowid) AS seq
+                      FROM readers) AS ranked
+                WHERE readers.rowid = ranked.id AND readers.{column} IS NULL
+            ''')
+            conn.execute(f'''
+                UPDATE export_watermarks SET sequence = (
+                    SELECT COALESCE(MAX({column}), 0) FROM readers
+                    WHERE readers.{basis} <= export_watermarks.watermark
+                )
+                WHERE basis = ? AND sequence IS NULL
+            ''', (basis,))
+        conn.execute('''
+            INSERT INTO counters (name, value)
+            SELECT 'change_seq', MAX(COALESCE(MAX(created_seq), 0), COALESCE(MAX(changed_seq), 0))
+            FROM readers
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS readers_created_seq ON readers (created_seq)')
+        conn.execute('CREATE INDEX IF NOT EXISTS readers_changed_seq ON readers (changed_seq)')
+        conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+# Within one dump the first record per username wins (as before); a newer
+# dump replaces it, but updated_at and changed_seq only move when the record
+# really changed. Replaying a batch from the same dump is therefore a no-op.
+UPSERT_READER_SQL = '''
+    INSERT INTO readers (username, record, record_hash, source, first_seen, updated_at,
+                         created_seq, changed_seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (username) DO UPDATE SET
+        record = excluded.record,
+        record_hash = excluded.record_hash,
+        source = excluded.source,
+        updated_at = CASE WHEN readers.record_hash != excluded.record_hash
+                          THEN excluded.updated_at ELSE readers.updated_at END,
+        changed_seq = CASE WHEN readers.record_hash != excluded.record_hash
+                           THEN excluded.changed_seq ELSE readers.changed_seq END
+    WHERE readers.source != excluded.source
+'''
+
+UPSERT_CHECKPOINT_SQL = '''
+    INSERT INTO ingest_checkpoints (source, byte_offset, items, complete, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (source) DO UPDATE SET
+        byte_offset = MAX(byte_offset, excluded.byte_offset),
+        items = MAX(items, excluded.items),
+        complete = MAX(complete, excluded.complete),
+        updated_at = excluded.updated_at
+'''
+
+class IngestJob:
+    """Resumable ingestion of one scrape dump into the reader database
+    
+    Every batch of readers is upserted in the same transaction as the byte
+    offset it ends at, so a crash loses at most the batch in flight and the
+    next run continues from the last checkpoint. Checkpoints are keyed on
+    the dump's path and identity; a new dump starts from the top.
+    """
+    
+    def __init__(self, json_path, db_path=None, batch_size=INGEST_BATCH_SIZE, on_progress=None,
+                 on_batch=None, image_cache=None):
+        self.json_path = json_path
+        self.db_path = db_path or reader_db_path(json_path)
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.on_batch = on_batch
+        self.image_cache = image_cache
+        identity = file_identity(json_path)
+        if identity is None:
+            raise FileNotFoundError(json_path)
+        self.source = f"{os.path.abspath(json_path)}:{identity[0]}:{identity[1]}"
+        self.bytes_total = identity[1]
+        self.bytes_done = 0
+        self.items = 0
+        self.complete = False
+        # (followers, avatar) of the most-followed readers seen, for prefetching
+        self._top_avatars = []
+    
+    def run(self):
+        conn = open_reader_db(self.db_path)
+        try:
+            row = conn.execute(
+                'SELECT byte_offset, items, complete FROM ingest_checkpoints WHERE source = ?',
+                (self.source,)
+            ).fetchone()
+            if row:
+                self.bytes_done, self.items, self.complete = row[0], row[1], bool(row[2])
+                self._report()
+            if self.complete:
+                if read_summary(self.json_path) is None:
+                    write_summary(self.json_path, self.db_path)
+                return self
             
-            # Create reader record
-            reader = {
-                'username': author.get('name', ''),
-                'display_name': author.get('nickName', ''),
-                'bio': bio,
-                'followers': author.get('fans', 0),
-                'following': author.get('following', 0),
-                'videos': author.get('video', 0),
-                'hearts': author.get('heart', 0),
-                'email': email,
-                'hashtags': hashtags,
-                'engagement': {
-                    'avg_likes': item.get('diggCount', 0),
-                    'avg_comments': item.get('commentCount', 0),
-                    'avg_shares': item.get('shareCount', 0),
-                    'views': item.get('playCount', 0)
-                },
-                'profile_url': author.get('profileUrl', ''),
-                'discovered_date': datetime.now().isoformat()
-            }
+            batch, edges, sounds, pending, offset = [], [], set(), 0, self.bytes_done
+            for item, offset in iter_scrape_items(self.json_path, self.bytes_done):
+                reader = reader_from_item(item)
+                if reader:
+                    batch.append(reader)
+                edges.extend(interaction_edges(item))
+                # Every video's sound, not just each reader's first one
+                sound = sound_name(item)
+                if sound:
+                    sounds.add(sound)
+                pending += 1
+                if pending >= self.batch_size:
+                    self._commit(conn, batch, edges, sounds, pending, offset)
+                    batch, edges, sounds, pending = [], [], set(), 0
+            self._commit(conn, batch, edges, sounds, pending, max(offset, self.bytes_total), complete=True)
+        finally:
+            conn.close()
+        write_summary(self.json_path, self.db_path)
+        return self
+    
+    def _commit(self, conn, batch, edges, sounds, items, offset, complete=False):
+        now = datetime.now().isoformat()
+        rows = []
+        for reader in batch:
+            record = json.dumps(reader, sort_keys=True)
+            digest = hashlib.sha1(record.encode('utf-8')).hexdigest()
+            rows.append((reader['username'], record, digest, self.source, now, now))
+        with conn:
+            # Reserved inside the write transaction, so sequence numbers follow
+            # commit order whatever the clocks of the writers say
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = 'change_seq'", (len(rows),))
+            end = conn.execute("SELECT value FROM counters WHERE name = 'change_seq'").fetchone()[0]
+            rows = [row + (seq, seq) for row, seq in zip(rows, range(end - len(rows) + 1, end + 1))]
+            conn.executemany(UPSERT_READER_SQL, rows)
+            # Keyed per video, so overlapping dumps never count an edge twice
+            conn.executemany('INSERT OR IGNORE INTO edges (video, source, target, kind) VALUES (?, ?, ?, ?)',
+                             edges)
+            conn.executemany('INSERT OR IGNORE INTO sounds (name) VALUES (?)', ((s,) for s in sounds))
+            conn.execute(UPSERT_CHECKPOINT_SQL,
+                         (self.source, offset, self.items + items, int(complete), now))
+        self.bytes_done = offset
+        self.items += items
+        self.complete = complete
+        if self.image_cache:
+            # Pages show at most AVATAR_ROWS avatars (and fetch what they show
+            # on demand), so only warm the cache for the most-followed readers
+            self._top_avatars = heapq.nlargest(AVATAR_ROWS, itertools.chain(
+                self._top_avatars,
+                ((r.get('followers') or 0, r['avatar']) for r in batch if r.get('avatar'))
+            ))
+            if complete:
+                self.image_cache.prefetch_async(avatar for _, avatar in self._top_avatars)
+        if self.on_batch and batch:
+            self.on_batch(batch)
+        self._report()
+    
+    def _report(self):
+        if self.on_progress:
+            self.on_progress(self)
+
+def read_reader_db(db_path):
+    """Every reader in the database, in first-seen order"""
+    conn = open_reader_db(db_path)
+    try:
+        readers = []
+        for record, first_seen in conn.execute('SELECT record, first_seen FROM readers ORDER BY rowid'):
+            reader = json.loads(record)
+            reader['discovered_date'] = first_seen
             readers.append(reader)
+        return readers
+    finally:
+        conn.close()
+
+def ingest_arc_readers(json_path, on_progress=None, on_batch=None):
+    """Bring the reader database up to date with a dump and return all readers"""
+    job = IngestJob(json_path, on_progress=on_progress, on_batch=on_batch,
+                    image_cache=get_image_cache()).run()
+    return read_reader_db(job.db_path)
+
+@shared_cached('arc_readers', ignore=('on_progress', 'on_batch'))
+def load_parsed_readers(json_path, identity, on_progress=None, on_batch=None):
+    """Readers after ingesting one version of the file; `identity` keys the shared cache"""
+    return ingest_arc_readers(json_path, on_progress, on_batch)
+
+class ReaderStore:
+    """The current reader dataset for one JSON file, reloaded in the background
+    
+    The dataset is keyed on the file's (mtime, size). When the file changes,
+    a new dataset is built on a worker thread while the old one keeps being
+    served, then swapped in with a single assignment.
+    
+    The first load runs on a worker thread too: while it ingests, each
+    committed batch publishes the readers seen so far as a new version
+    (with identity None), so pages can show results straight away.
+    """
+    
+    def __init__(self, json_path, poll_seconds=RELOAD_POLL_SECONDS):
+        self.json_path = json_path
+        self.poll_seconds = poll_seconds
+        self.reloading = False
+        self.loading = False  # first load still running; readers are partial
+        self.last_error = None
+        self.progress = None  # (bytes done, bytes total, items) while ingesting
+        self._current = None  # (identity, version, readers)
+        self._failed_identity = None
+        self._partial = {}  # username -> reader, while loading
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._derived = {}  # name -> (version, value)
+        self._derived_lock = threading.RLock()
+        self._local = threading.local()
+    
+    @property
+    def identity(self):
+        return self._current[0] if self._current else None
+    
+    @property
+    def version(self):
+        return self._current[1] if self._current else 0
+    
+    def snapshot(self):
+        """Return the current readers (only those ingested so far while loading)"""
+        return self.current()[2]
+    
+    def current(self):
+        """Return the current (identity, version, readers) as one consistent tuple"""
+        pinned = getattr(self._local, 'pinned', None)
+        if pinned:
+            return pinned
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._start_first_load()
+            self._start_watcher()
+        elif not self.loading and self._is_stale():
+            self.reload_async()
+        return self._current
+    
+    @contextlib.contextmanager
+    def pinned(self):
+        """Serve this thread one dataset version for the duration of the block
         
-        # Remove duplicates by username
-        unique_readers = {}
-        for r in readers:
-            if r['username'] and r['username'] not in unique_readers:
-                unique_readers[r['username']] = r
-        
-        return list(unique_readers.values())
+        Frames, scores and masks derived inside the block then line up even
+        while a load publishes new versions underneath.
+        """
+        outer = getattr(self._local, 'pinned', None)
+        self._local.pinned = self.current()
+        try:
+            yield self._local.pinned
+        finally:
+            self._local.pinned = outer
+    
+    def derived(self, name, builder):
+        """Memoize builder(readers) for the current dataset version"""
+        with self.pinned() as (identity, version, readers):
+            cached = self._derived.get(name)
+            if cached and cached[0] == version:
+                return cached[1]
+            with self._derived_lock:
+                cached = self._derived.get(name)
+                if cached and cached[0] == version:
+                    return cached[1]
+                value = builder(readers)
+                self._derived[name] = (version, value)
+            return value
+    
+    def reload_async(self):
+        """Start building a fresh dataset unless a reload is already running"""
+        with self._lock:
+            if self.reloading:
+                return
+            self.reloading = True
+        threading.Thread(target=self._reload, daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _is_stale(self):
+        identity = file_identity(self.json_path)
+        return identity != self.identity and identity != self._failed_identity
+    
+    def _start_first_load(self):
+        # Called with _lock held
+        if file_identity(self.json_path) is None:
+            self._current = (None, 1, get_sample_arc_readers())
+            return
+        self._current = (None, 1, [])
+        self.loading = self.reloading = True
+        threading.Thread(target=self._reload, daemon=True).start()
+    
+    def _build(self):
+        # Read the identity before parsing, so a write that lands mid-parse
+        # is picked up by the next poll
+        identity = file_identity(self.json_path)
+        if identity is None:
+            return None, get_sample_arc_readers()
+        try:
+            readers = load_parsed_readers(self.json_path, identity, on_progress=self._on_progress,
+                                          on_batch=self._on_batch if self.loading else None)
+        finally:
+            self.progress = None
+        return identity, readers
     
-    # If no file, return sample data
-    return get_sample_arc_readers()
+    def _on_progress(self, job):
+        self.progress = (job.bytes_done, job.bytes_total, job.items)
+    
+    def _on_batch(self, readers):
+        # First record per username wins, as in the database
+        for reader in readers:
+            self._partial.setdefault(reader['username'], reader)
+        self._current = (None, self.version + 1, list(self._partial.values()))
+    
+    def _reload(self):
+        try:
+            identity, readers = self._build()
+            self._current = (identity, self.version + 1, readers)
+            self.last_error = None
+            if identity and read_summary(self.json_path) is None:
+                # Readers came from the shared cache for a dump ingested
+                # before summaries existed
+                write_summary(self.json_path, reader_db_path(self.json_path))
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # Usually a scrape still being written: keep serving the old data
+            self._failed_identity = file_identity(self.json_path)
+            self.last_error = e
+        finally:
+            self._partial = {}
+            self.loading = self.reloading = False
+    
+    def _start_watcher(self):
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+        self._watcher.start()
+    
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            if not self.reloading and self._is_stale():
+                self.reload_async()
+
+@st.cache_resource
+def get_image_cache():
+    """Local avatar/image cache shared by all sessions"""
+    return ImageCache()
+
+@st.cache_resource
+def get_reader_store_at(path):
+    return ReaderStore(path)
+
+def get_reader_store(json_path="arc_readers.json"):
+    """One background-reloading store per JSON file, shared by all sessions"""
+    # Normalized, so get_reader_store() and get_reader_store(path) share a store
+    return get_reader_store_at(os.path.abspath(json_path))
+
+def load_arc_readers(json_path="arc_readers.json"):
+    """Load the ARC readers, falling back to sample data when no JSON file exists"""
+    return get_reader_store(json_path).snapshot()
 
 def get_sample_arc_readers():
     """Sample ARC readers for demo when no JSON file exists"""
@@ -169,6 +864,1188 @@ def get_sample_arc_readers():
         }
     ]
 
+# ============================================================================
+# READER SCORING & RANKING
+# ============================================================================
+
+READER_COLUMNS = ['username', 'display_name', 'bio', 'followers', 'following', 'videos',
+                  'hearts', 'email', 'hashtags', 'avatar', 'profile_url']
+ENGAGEMENT_COLUMNS = ['avg_likes', 'avg_comments', 'avg_shares', 'views']
+
+# Hashtags that mark a reader as covering a genre (keys match the page selectboxes)
+GENRE_HASHTAGS = {
+    'romance': ['romance', 'romancebooks', 'romancebooktok', 'romancereads',
+                'contemporaryromance', 'darkromance', 'spicybooks'],
+    'romantasy': ['romantasy', 'romantasybooks', 'fantasyromance', 'romantasybooktok'],
+    'fantasy': ['fantasy', 'fantasybooks', 'fantasybooktok', 'epicfantasy', 'highfantasy'],
+    'thriller': ['thriller', 'thrillerbooks', 'thrillerbooktok', 'mystery', 'mysterybooks',
+                 'psychologicalthriller'],
+    'ya': ['ya', 'yabooks', 'yabooktok', 'youngadult', 'yafantasy']
+}
+
+# Ranked tables embed thumbnails inline, so only the top of the table gets them
+AVATAR_ROWS = 200
+
+FOLLOWER_TIER_BINS = [0, 1000, 10000, 50000, 100000, np.inf]
+FOLLOWER_TIER_LABELS = ['nano', 'micro', 'mid', 'macro', 'mega']
+
+# Weights of the composite fit score; the parts are all percentiles in [0, 1]
+FIT_WEIGHTS = {
+    'view_engagement_pct': 0.35,
+    'follower_engagement_pct': 0.25,
+    'follower_pct': 0.15,
+    'genre_match': 0.15,
+    'has_email': 0.10
+}
+
+def build_reader_frame(readers):
+    """Flatten reader dicts into one column per field"""
+    frame = pd.DataFrame(readers).reindex(columns=READER_COLUMNS + ['engagement'])
+    engagement = pd.DataFrame(
+        [r if isinstance(r, dict) else {} for r in frame.pop('engagement')],
+        index=frame.index
+    ).reindex(columns=ENGAGEMENT_COLUMNS)
+    frame = pd.concat([frame, engagement], axis=1)
+    
+    numeric = ['followers', 'following', 'videos', 'hearts'] + ENGAGEMENT_COLUMNS
+    frame[numeric] = frame[numeric].apply(pd.to_numeric, errors='coerce').fillna(0)
+    frame['hashtags'] = frame['hashtags'].apply(lambda h: h if isinstance(h, list) else [])
+    for col in ['username', 'display_name', 'bio', 'avatar', 'profile_url']:
+        frame[col] = frame[col].fillna('')
+    frame['email'] = frame['email'].where(frame['email'].astype(bool) & frame['email'].notna(), None)
+    return frame
+
+def build_hashtag_index(frame):
+    """One row per (reader position, lowercased hashtag) for vectorized membership tests"""
+    tags = frame['hashtags'].explode().dropna().astype(str).str.lower()
+    return tags
+
+def genre_mask(frame, tags, genre):
+    """Boolean array: readers with at least one hashtag of `genre`"""
+    names = GENRE_HASHTAGS.get((genre or '').lower())
+    if not names:
+        return np.ones(len(frame), dtype=bool)
+    hit = tags.isin(names)
+    mask = np.zeros(len(frame), dtype=bool)
+    mask[frame.index.get_indexer(tags.index[hit.to_numpy()].unique())] = True
+    return mask
+
+def build_reader_scores(frame):
+    """Engagement rates, follower tiers and percentiles for every reader at once"""
+    interactions = frame[['avg_likes', 'avg_comments', 'avg_shares']].to_numpy(float).sum(axis=1)
+    views = frame['views'].to_numpy(float)
+    followers = frame['followers'].to_numpy(float)
+    
+    view_rate = np.divide(interactions, views, out=np.zeros_like(interactions), where=views > 0)
+    follower_rate = np.divide(interactions, followers, out=np.zeros_like(interactions), where=followers > 0)
+    
+    scores = pd.DataFrame({
+        'view_engagement': view_rate,
+        'follower_engagement': follower_rate,
+        'tier': pd.cut(followers, FOLLOWER_TIER_BINS, labels=FOLLOWER_TIER_LABELS, right=False)
+    }, index=frame.index)
+    scores['view_engagement_pct'] = scores['view_engagement'].rank(pct=True)
+    scores['follower_engagement_pct'] = scores['follower_engagement'].rank(pct=True)
+    scores['follower_pct'] = frame['followers'].rank(pct=True)
+    scores['tier_pct'] = frame['followers'].groupby(scores['tier'], observed=True).rank(pct=True)
+    scores['has_email'] = frame['email'].notna().astype(float)
+    
+    base = np.zeros(len(frame))
+    for col, weight in FIT_WEIGHTS.items():
+        if col in scores:
+            base += weight * scores[col].to_numpy(float)
+    scores['base_fit'] = base
+    return scores
+
+def top_k_indices(values, k):
+    """Positions of the k largest values, best first, via a partial sort"""
+    values = np.asarray(values)
+    k = min(int(k), len(values))
+    if k <= 0:
+        return np.array([], dtype=int)
+    if k < len(values):
+        idx = np.argpartition(-values, k - 1)[:k]
+    else:
+        idx = np.arange(len(values))
+    return idx[np.argsort(-values[idx], kind='stable')]
+
+def with_avatar_images(df, rows=AVATAR_ROWS):
+    """Copy of `df` with avatar URLs swapped for locally cached thumbnails
+    
+    Only the first `rows` get images; the browser never fetches from TikTok.
+    Avatars not cached yet are queued for download and appear on a later rerun.
+    """
+    cache = get_image_cache()
+    urls = df['avatar'].tolist()
+    cache.prefetch_async(urls[:rows])
+    df = df.copy()
+    df['avatar'] = [cache.data_uri(url) if i < rows and url else None for i, url in enumerate(urls)]
+    return df
+
+def load_reader_frame(json_path="arc_readers.json"):
+    return get_reader_store(json_path).derived('frame', build_reader_frame)
+
+def load_hashtag_index(json_path="arc_readers.json"):
+    store = get_reader_store(json_path)
+    return store.derived('hashtags', lambda readers: build_hashtag_index(load_reader_frame(json_path)))
+
+def load_reader_scores(json_path="arc_readers.json"):
+    store = get_reader_store(json_path)
+    return store.derived('scores', lambda readers: build_reader_scores(load_reader_frame(json_path)))
+
+def rank_readers(genre=None, k=100, mask=None, json_path="arc_readers.json", by='fit_score', network=True):
+    """Top-k readers by fit score or network influence, optionally restricted by a boolean mask
+    
+    `network` adds the influence column (building the creator graph if needed).
+    """
+    fit = reader_fit(genre, json_path)
+    influence = load_reader_influence(json_path) if network or by == 'influence' else None
+    
+    order = influence if by == 'influence' else fit
+    if mask is not None:
+        order = np.where(mask, order, -np.inf)
+        k = min(k, int(np.count_nonzero(mask)))
+    
+    return scored_readers(top_k_indices(order, k), fit, influence if network else None, json_path)
+
+def select_readers(mask, genre=None, json_path="arc_readers.json"):
+    """Every reader in `mask`, in dataset order, with the same columns as rank_readers"""
+    return scored_readers(np.flatnonzero(mask), reader_fit(genre, json_path),
+                          load_reader_influence(json_path), json_path)
+
+def reader_fit(genre=None, json_path="arc_readers.json"):
+    """Fit score per reader, with the genre bonus when a genre is given"""
+    fit = load_reader_scores(json_path)['base_fit'].to_numpy(float)
+    if genre and genre.lower() in GENRE_HASHTAGS:
+        frame = load_reader_frame(json_path)
+        fit = fit + FIT_WEIGHTS['genre_match'] * genre_mask(frame, load_hashtag_index(json_path), genre)
+    return fit
+
+def scored_readers(idx, fit, influence=None, json_path="arc_readers.json"):
+    """Frame rows `idx` plus their fit, engagement, tier and (given) influence columns"""
+    scores = load_reader_scores(json_path)
+    rows = load_reader_frame(json_path).iloc[idx].copy()
+    rows['fit_score'] = np.round(fit[idx] * 100, 1)
+    rows['engagement_rate'] = np.round(scores['view_engagement'].to_numpy()[idx] * 100, 2)
+    rows['tier'] = scores['tier'].to_numpy()[idx]
+    if influence is not None:
+        rows['influence'] = np.round(influence[idx], 2)
+    return rows
+
+# ============================================================================
+# FILTER EXPRESSIONS
+# ============================================================================
+# e.g. followers between 2k and 50k AND hashtags has romantasy
+#      AND bio contains "ARC" AND avg_comments > 10
+
+NUMERIC_FILTER_FIELDS = ['followers', 'following', 'videos', 'hearts',
+                         'avg_likes', 'avg_comments', 'avg_shares', 'views',
+                         'engagement_rate', 'fit_score']
+TEXT_FILTER_FIELDS = ['username', 'display_name', 'bio', 'email']
+FILTER_MASK_CACHE_SIZE = 64
+
+FILTER_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<string>"[^"]*"|'[^']*')
+      | (?P<number>\d+(?:\.\d+)?[kKmM]?)(?![\w.])
+      | (?P<op>>=|<=|!=|==|=|>|<)
+      | (?P<paren>[()])
+      | (?P<word>[\w#@.\-]+)
+    )''', re.VERBOSE)
+
+COMPARISONS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+    '=': np.equal, '==': np.equal, '!=': np.not_equal
+}
+
+def parse_number(text):
+    multiplier = {'k': 1e3, 'm': 1e6}.get(text[-1].lower(), 1)
+    return float(text.rstrip('kKmM')) * multiplier
+
+class MaskCache:
+    """LRU of full filter masks for one dataset version
+    
+    Shared by every session, so lookups and evictions happen under one
+    lock: a get that touches an entry can't race another session's
+    eviction of it.
+    """
+    
+    def __init__(self, size=FILTER_MASK_CACHE_SIZE):
+        self.size = size
+        self._masks = collections.OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+            return mask
+    
+    def put(self, key, mask):
+        with self._lock:
+            self._masks[key] = mask
+            self._masks.move_to_end(key)
+            while len(self._masks) > self.size:
+                self._masks.popitem(last=False)
+
+class FilterContext:
+    """Reader columns plus a mask cache shared by every filter over one dataset version"""
+    
+    def __init__(self, frame, scores, tags, cache):
+        self.frame = frame
+        self.scores = scores
+        self.tags = tags
+        self.cache = cache
+        self.size = len(frame)
+    
+    def column(self, field, positions=None):
+        if field == 'engagement_rate':
+            values = self.scores['view_engagement'].to_numpy(float) * 100
+        elif field == 'fit_score':
+            values = self.scores['base_fit'].to_numpy(float) * 100
+        else:
+            values = self.frame[field].to_numpy()
+        return values if positions is None else values[positions]
+
+class FilterNode:
+    """A compiled sub-expression that produces a boolean mask over all readers
+    
+    Full masks are cached per sub-expression. When a parent has already
+    narrowed the candidates (`within`), expensive leaves only look at the
+    surviving rows instead.
+    """
+    
+    cost = 1
+    
+    def mask(self, ctx, within=None):
+        cached = ctx.cache.get(self.key)
+        if cached is not None:
+            return cached if within is None else cached & within
+        if within is not None and self.cost > 1 and np.count_nonzero(within) < ctx.size // 4:
+            positions = np.flatnonzero(within)
+            result = np.zeros(ctx.size, dtype=bool)
+            result[positions] = self.evaluate(ctx, positions)
+            return result
+        result = self.evaluate(ctx, None)
+        ctx.cache.put(self.key, result)
+        return result if within is None else result & within
+
+class Compare(FilterNode):
+    def __init__(self, field, op, value):
+        self.field, self.op, self.value = field, op, value
+        # Exact value: masks are shared, so 1234567 and 1234570 must not collide
+        self.key = f"{field} {op} {float(value)!r}"
+    
+    def evaluate(self, ctx, positions):
+        return COMPARISONS[self.op](ctx.column(self.field, positions).astype(float), self.value)
+
+class Between(FilterNode):
+    def __init__(self, field, low, high):
+        self.field, self.low, self.high = field, min(low, high), max(low, high)
+        self.key = f"{field} between {float(self.low)!r} and {float(self.high)!r}"
+    
+    def evaluate(self, ctx, positions):
+        values = ctx.column(self.field, positions).astype(float)
+        return (values >= self.low) & (values <= self.high)
+
+class Contains(FilterNode):
+    cost = 3
+    
+    def __init__(self, field, text):
+        self.field, self.text = field, text
+        self.key = f"{field} contains {text.lower()!r}"
+    
+    def evaluate(self, ctx, positions):
+        values = pd.Series(ctx.column(self.field, positions)).fillna('')
+        return values.str.contains(self.text, case=False, regex=False).to_numpy()
+
+class Exists(FilterNode):
+    def __init__(self, field):
+        self.field = field
+        self.key = f"{field} exists"
+    
+    def evaluate(self, ctx, positions):
+        values = pd.Series(ctx.column(self.field, positions))
+        return (values.notna() & values.astype(str).str.len().gt(0)).to_numpy()
+
+class HasHashtag(FilterNode):
+    cost = 2
+    
+    def __init__(self, tag):
+        self.tag = tag.lstrip('#').lower()
+        self.key = f"hashtags has {self.tag}"
+    
+    def evaluate(self, ctx, positions):
+        result = np.zeros(ctx.size, dtype=bool)
+        result[ctx.tags.index[(ctx.tags == self.tag).to_numpy()]] = True
+        return result if positions is None else result[positions]
+
+class AllOf(FilterNode):
+    def __init__(self, children):
+        # Cheap tests first, so expensive ones see fewer candidates
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = max(c.cost for c in children)
+        self.key = '(' + ' AND '.join(sorted(c.key for c in children)) + ')'
+    
+    def mask(self, ctx, within=None):
+        cached = ctx.cache.get(self.key)
+        if cached is not None:
+            return cached if within is None else cached & within
+        result = within
+        for child in self.children:
+            result = child.mask(ctx, result)
+            if not result.any():
+                break
+        if within is None:
+            ctx.cache.put(self.key, result)
+        return result
+
+class AnyOf(FilterNode):
+    def __init__(self, children):
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = max(c.cost for c in children)
+        self.key = '(' + ' OR '.join(sorted(c.key for c in children)) + ')'
+    
+    def mask(self, ctx, within=None):
+        cached = ctx.cache.get(self.key)
+        if cached is not None:
+            return cached if within is None else cached & within
+        result = self.children[0].mask(ctx, within)
+        for child in self.children[1:]:
+            # Only rows no earlier branch matched still need testing
+            undecided = ~result if within is None else within & ~result
+            if not undecided.any():
+                break
+            result = result | child.mask(ctx, undecided)
+        if within is None:
+            ctx.cache.put(self.key, result)
+        return result
+
+class Negation(FilterNode):
+    def __init__(self, child):
+        self.child = child
+        self.cost = child.cost
+        self.key = f"NOT {child.key}"
+    
+    def mask(self, ctx, within=None):
+        inner = ~self.child.mask(ctx, within)
+        return inner if within is None else inner & within
+
+class FilterParser:
+    """Recursive-descent parser: OR binds loosest, then AND, then NOT"""
+    
+    def __init__(self, text):
+        self.tokens = []
+        pos = 0
+        text = text.strip()
+        while pos < len(text):
+            match = FILTER_TOKEN_PATTERN.match(text, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Unexpected character at position {pos}: {text[pos:pos + 10]!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            pos = match.end()
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+        self.pos = 0
+    
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+    
+    def take(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Filter ends unexpectedly")
+        self.pos += 1
+        return token
+    
+    def keyword(self, *words):
+        kind, value = self.peek()
+        if kind == 'word' and value.lower() in words:
+            self.pos += 1
+            return value.lower()
+        return None
+    
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] is not None:
+            raise ValueError(f"Unexpected {self.peek()[1]!r}")
+        return node
+    
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.keyword('or'):
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else AnyOf(children)
+    
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.keyword('and'):
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else AllOf(children)
+    
+    def parse_not(self):
+        if self.keyword('not'):
+            return Negation(self.parse_not())
+        if self.peek() == ('paren', '('):
+            self.take()
+            node = self.parse_or()
+            if self.take() != ('paren', ')'):
+                raise ValueError("Missing closing parenthesis")
+            return node
+        return self.parse_condition()
+    
+    def number(self):
+        kind, value = self.take()
+        if kind != 'number':
+            raise ValueError(f"Expected a number, got {value!r}")
+        return parse_number(value)
+    
+    def text(self):
+        kind, value = self.take()
+        if kind == 'string':
+            return value[1:-1]
+        if kind in ('word', 'number'):
+            return value
+        raise ValueError(f"Expected text, got {value!r}")
+    
+    def parse_condition(self):
+        kind, field = self.take()
+        field = field.lower()
+        if kind != 'word' or field not in NUMERIC_FILTER_FIELDS + TEXT_FILTER_FIELDS + ['hashtags']:
+            raise ValueError(f"Unknown field {field!r}")
+        
+        if field == 'hashtags':
+            if not self.keyword('has', 'contains'):
+                raise ValueError("Use: hashtags has <tag>")
+            return HasHashtag(self.text())
+        if self.keyword('exists'):
+            return Exists(field)
+        if field in TEXT_FILTER_FIELDS:
+            if not self.keyword('contains'):
+                raise ValueError(f"Use: {field} contains \"text\"  or  {field} exists")
+            return Contains(field, self.text())
+        if self.keyword('between'):
+            low = self.number()
+            if not self.keyword('and'):
+                raise ValueError("Use: <field> between <low> and <high>")
+            return Between(field, low, self.number())
+        kind, op = self.take()
+        if kind != 'op':
+            raise ValueError(f"Expected a comparison after {field!r}")
+        return Compare(field, op, self.number())
+
+@st.cache_resource(max_entries=256)
+def compile_filter(text):
+    """Parse a filter expression into a FilterNode (raises ValueError on bad syntax)"""
+    return FilterParser(text).parse()
+
+def filter_readers(text, json_path="arc_readers.json"):
+    """Boolean mask over the reader frame for a filter expression"""
+    node = compile_filter(text)
+    store = get_reader_store(json_path)
+    ctx = FilterContext(
+        load_reader_frame(json_path),
+        load_reader_scores(json_path),
+        load_hashtag_index(json_path),
+        store.derived('filter_masks', lambda readers: MaskCache())
+    )
+    return node.mask(ctx)
+
+# ============================================================================
+# SIMILAR READERS
+# ============================================================================
+
+BIO_TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9']{2,}")
+STOP_WORDS = frozenset([
+    'and', 'the', 'for', 'you', 'your', 'with', 'are', 'but', 'not', 'all', 'any', 'can',
+    'from', 'her', 'his', 'she', 'him', 'they', 'this', 'that', 'have', 'has', 'was',
+    'just', 'about', 'what', 'who', 'our', 'out', 'com', 'gmail', 'www', 'http', 'https'
+])
+SIMILAR_NEIGHBOURS = 20
+# Upper bound on non-zeros in one block of the sparse cosine matrix
+SIMILARITY_BLOCK_BUDGET = 20_000_000
+# Tags nearly every BookTok reader uses, which say nothing about fit
+SIMILARITY_STOP_TAGS = frozenset([
+    '#booktok', '#booktoker', '#arcreader', '#arcreaders', '#bookish', '#books',
+    '#reading', '#fyp', '#foryou', '#foryoupage'
+])
+# Terms on more than this share of readers are dropped as well; anything
+# rarer is left to IDF, since genre tags (#romance) are the main signal
+SIMILARITY_MAX_DF = 0.5
+
+def reader_terms(hashtags, bio):
+    """Hashtags (prefixed with #) plus bio words for one reader"""
+    terms = {'#' + str(h).lower() for h in hashtags} - SIMILARITY_STOP_TAGS
+    terms.update(w for w in BIO_TOKEN_PATTERN.findall(bio.lower()) if w not in STOP_WORDS)
+    return terms
+
+class SimilarityIndex:
+    """TF-IDF vectors over hashtags and bio terms with precomputed nearest neighbours"""
+    
+    def __init__(self, frame, neighbours=SIMILAR_NEIGHBOURS):
+        self.usernames = frame['username'].to_numpy()
+        self.positions = {u: i for i, u in enumerate(self.usernames)}
+        self.matrix = self._vectorize(frame)
+        self.neighbours, self.similarities = self._build_neighbours(neighbours)
+    
+    def _vectorize(self, frame):
+        vocab, indices, indptr = {}, [], [0]
+        for hashtags, bio in zip(frame['hashtags'], frame['bio']):
+            indices.extend(vocab.setdefault(t, len(vocab)) for t in reader_terms(hashtags, bio))
+            indptr.append(len(indices))
+        
+        n = len(frame)
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, np.asarray(indptr, dtype=np.int64)),
+            shape=(n, len(vocab))
+        )
+        doc_freq = np.bincount(indices, minlength=len(vocab))
+        idf = np.log((1 + n) / (1 + doc_freq)) + 1
+        idf[doc_freq > max(SIMILARITY_MAX_DF * n, 1)] = 0
+        
+        matrix = counts @ sparse.diags(idf)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        matrix = sparse.diags(1 / norms) @ matrix
+        matrix.eliminate_zeros()
+        return matrix.tocsr()
+    
+    def _build_neighbours(self, k):
+        n = self.matrix.shape[0]
+        neighbours = np.full((n, k), -1, dtype=np.int64)
+        similarities = np.zeros((n, k))
+        
+        # Readers with the same terms share a vector (tag-only readers mostly
+        # use a handful of tag sets), so neighbours are found between the
+        # distinct vectors and then handed out to the readers behind them
+        members = self._identical_rows()
+        unique = self.matrix[[m[0] for m in members]]
+        transposed = unique.T.tocsc()
+        doc_freq = np.bincount(unique.indices, minlength=unique.shape[1])
+        
+        # Sparse blocks of the cosine matrix, sized so each block's worst-case
+        # non-zeros (sum of its terms' document frequencies) fits the budget
+        g = len(members)
+        row_cost = (unique != 0) @ doc_freq
+        bounds = np.searchsorted(np.cumsum(row_cost), np.arange(1, g + 1) * SIMILARITY_BLOCK_BUDGET)
+        starts = np.unique(np.concatenate([[0], bounds[bounds < g]]))
+        for start, stop in zip(starts, np.append(starts[1:], g)):
+            block = (unique[start:stop] @ transposed).tocsr()
+            for row in range(block.shape[0]):
+                lo, hi = block.indptr[row], block.indptr[row + 1]
+                cols, vals = block.indices[lo:hi], block.data[lo:hi]
+                # k + 1 readers (one may be the reader itself), own group first
+                picks, sims = [], []
+                for best in top_k_indices(vals, k + 1):
+                    take = members[cols[best]][:k + 1 - len(picks)]
+                    picks.extend(take)
+                    sims.extend([vals[best]] * len(take))
+                    if len(picks) > k:
+                        break
+                picks, sims = np.asarray(picks, dtype=np.int64), np.asarray(sims)
+                for reader in members[start + row]:
+                    keep = picks != reader
+                    found = picks[keep][:k]
+                    neighbours[reader, :len(found)] = found
+                    similarities[reader, :len(found)] = sims[keep][:k]
+        return neighbours, similarities
+    
+    def _identical_rows(self):
+        """Reader positions grouped by identical vector, in first-seen order"""
+        self.matrix.sort_indices()
+        indices, indptr = self.matrix.indices, self.matrix.indptr
+        ids = {}
+        group = np.array([ids.setdefault(indices[indptr[i]:indptr[i + 1]].tobytes(), len(ids))
+                          for i in range(self.matrix.shape[0])], dtype=np.int64)
+        order = np.argsort(group, kind='stable')
+        bounds = np.searchsorted(group[order], np.arange(len(ids) + 1))
+        return [order[bounds[i]:bounds[i + 1]] for i in range(len(ids))]
+    
+    def similar(self, username, k=10):
+        """(positions, similarities) of the k readers most like `username`"""
+        pos = self.positions.get(username)
+        if pos is None:
+            raise KeyError(username)
+        if self.matrix[pos].nnz == 0:
+            raise ValueError(f"@{username} has no distinctive hashtags or bio terms to compare")
+        if k <= self.neighbours.shape[1]:
+            found = self.neighbours[pos, :k]
+            valid = found >= 0
+            return found[valid], self.similarities[pos, :k][valid]
+        # Beyond the precomputed list: one sparse mat-vec over the whole set
+        sims = (self.matrix @ self.matrix[pos].T).toarray().ravel()
+        sims[pos] = 0
+        best = top_k_indices(sims, k)
+        best = best[sims[best] > 0]
+        return best, sims[best]
+
+@shared_cached('similarity')
+def build_similarity_index(json_path, identity):
+    return SimilarityIndex(load_reader_frame(json_path))
+
+def load_similarity_index(json_path="arc_readers.json"):
+    store = get_reader_store(json_path)
+    
+    def build(readers):
+        if store.loading:
+            # A partial dataset: not worth sharing with the other replicas
+            return SimilarityIndex(load_reader_frame(json_path))
+        return build_similarity_index(json_path, store.identity)
+    return store.derived('similarity', build)
+
+def find_similar_readers(username, k=10, json_path="arc_readers.json"):
+    """Readers whose hashtags and bio look most like `username`"""
+    with get_reader_store(json_path).pinned():
+        index = load_similarity_index(json_path)
+        positions, sims = index.similar(username, k)
+        similar = load_reader_frame(json_path).iloc[positions].copy()
+    similar['similarity'] = np.round(sims, 3)
+    return similar
+
+# ============================================================================
+# CREATOR NETWORK
+# ============================================================================
+# Mentions, duets and stitches from the scrape form a directed graph: an edge
+# A -> B means one of A's videos pointed its audience at B. Influence is
+# PageRank over that graph, so a creator ranks high when well-connected
+# creators keep sending viewers their way, whatever their follower count.
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITER = 100
+COMMUNITY_MAX_ITER = 30
+NETWORK_TOP = 25
+
+def pagerank(adjacency, damping=PAGERANK_DAMPING, tol=PAGERANK_TOLERANCE, max_iter=PAGERANK_MAX_ITER):
+    """PageRank by power iteration over a sparse weighted adjacency matrix (row -> column)"""
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition = (sparse.diags(inverse) @ adjacency).T.tocsr()
+    
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # Creators who point nowhere spread their rank evenly over everyone
+        new_rank = damping * (transition @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        converged = np.abs(new_rank - rank).sum() < tol
+        rank = new_rank
+        if converged:
+            break
+    return rank
+
+def label_propagation(adjacency, max_iter=COMMUNITY_MAX_ITER, seed=0):
+    """Community id per node: every node repeatedly adopts its neighbours' heaviest label
+    
+    Each round is one sparse product (votes = A @ membership) and a row
+    argmax over its CSR arrays. Ties are broken by a fixed random weight per
+    label, since lowest-id tie-breaking lets one label flood whole components.
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    # Self-loops keep every row non-empty and damp flip-flopping
+    undirected = (adjacency + adjacency.T + sparse.identity(n)).tocsr()
+    tie_break = 1 + 1e-6 * np.random.default_rng(seed).random(n)
+    rows = np.arange(n)
+    labels = rows.copy()
+    for _ in range(max_iter):
+        membership = sparse.csr_matrix((tie_break[labels], (rows, labels)), shape=(n, n))
+        votes = (undirected @ membership).tocsr()
+        row_of = np.repeat(rows, np.diff(votes.indptr))
+        row_max = np.maximum.reduceat(votes.data, votes.indptr[:-1])
+        best = np.flatnonzero(votes.data == row_max[row_of])
+        best = best[np.r_[True, row_of[best[1:]] != row_of[best[:-1]]]]
+        new_labels = votes.indices[best]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    # Renumber communities 0, 1, ... from the largest down
+    _, labels, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-sizes, kind='stable')
+    return np.argsort(order)[labels]
+
+class CreatorGraph:
+    """The creator interaction graph as a CSR matrix, with influence and communities"""
+    
+    def __init__(self, edges):
+        # edges: DataFrame of source, target, weight (one row per pair)
+        codes, names = pd.factorize(pd.concat([edges['source'], edges['target']], ignore_index=True))
+        n, m = len(names), len(edges)
+        self.names = np.asarray(names, dtype=object)
+        self.index = pd.Index(self.names)
+        self.adjacency = sparse.csr_matrix(
+            (edges['weight'].to_numpy(float), (codes[:m], codes[m:])), shape=(n, n)
+        )
+        self.influence = pagerank(self.adjacency)
+        self.community = label_propagation(self.adjacency)
+        self.inbound = np.asarray(self.adjacency.sum(axis=0)).ravel()
+        self.outbound = np.asarray(self.adjacency.sum(axis=1)).ravel()
+    
+    def influence_of(self, usernames):
+        """Influence aligned to `usernames`, relative to the network average (1.0); 0 if absent"""
+        positions = self.index.get_indexer(usernames)
+        values = np.zeros(len(positions))
+        found = positions >= 0
+        values[found] = self.influence[positions[found]] * len(self.names)
+        return values
+    
+    def top(self, k=NETWORK_TOP):
+        idx = top_k_indices(self.influence, k)
+        return pd.DataFrame({
+            'username': self.names[idx],
+            'influence': np.round(self.influence[idx] * len(self.names), 2),
+            'inbound': self.inbound[idx].astype(int),
+            'outbound': self.outbound[idx].astype(int),
+            'community': self.community[idx]
+        })
+
+def read_edges(db_path):
+    """Edge weights (number of videos) per (source, target) pair"""
+    conn = open_reader_db(db_path)
+    try:
+        return pd.read_sql_query(
+            'SELECT source, target, COUNT(*) AS weight FROM edges GROUP BY source, target', conn
+        )
+    finally:
+        conn.close()
+
+@shared_cached('creator_graph')
+def build_creator_graph(json_path, identity):
+    return CreatorGraph(read_edges(reader_db_path(json_path)))
+
+def load_creator_graph(json_path="arc_readers.json"):
+    store = get_reader_store(json_path)
+    
+    def build(readers):
+        if file_identity(json_path) is None:
+            return CreatorGraph(pd.DataFrame({'source': [], 'target': [], 'weight': []}))
+        if store.loading:
+            # Edges committed so far: not worth sharing with the other replicas
+            return CreatorGraph(read_edges(reader_db_path(json_path)))
+        return build_creator_graph(json_path, store.identity)
+    return store.derived('graph', build)
+
+def load_reader_influence(json_path="arc_readers.json"):
+    """Network influence for every reader, aligned to the reader frame"""
+    store = get_reader_store(json_path)
+    return store.derived('influence', lambda readers: load_creator_graph(json_path).influence_of(
+        load_reader_frame(json_path)['username']))
+
+def top_network_creators(k=NETWORK_TOP, json_path="arc_readers.json"):
+    """Most influential creators in the network, with follower counts where they are readers"""
+    with get_reader_store(json_path).pinned():
+        top = load_creator_graph(json_path).top(k)
+        frame = load_reader_frame(json_path)
+        followers = frame.set_index('username')['followers']
+        followers = followers[~followers.index.duplicated()]
+    top['followers'] = followers.reindex(top['username']).to_numpy()
+    return top
+
+# ============================================================================
+# PERSONA MATCHING
+# ============================================================================
+# Scores every reader against an author's persona and genre in one pass:
+# readers are rows of a feature matrix F, a persona is a weight vector w,
+# and F @ W.T scores a whole batch of personas at once. There are only
+# 4 author types × 4 interaction styles × 7 genres, so a batch of any
+# number of authors collapses to at most 112 distinct personas.
+
+# Bio/hashtag terms suggesting how a reader likes to work with authors
+MATCH_TERMS = {
+    'written': r'review|blog|goodreads|bookstagram|annotat|bookworm|booknerd',
+    'audio': r'audiobook|audible|narrat|podcast|listen',
+    'visual': r'aesthetic|booktube|bookhaul|haul|unboxing|edits',
+    'live': r'\blive\b|book ?club|event|signing|bookcon|convention'
+}
+MATCH_FEATURES = ['has_email', 'written', 'audio', 'visual', 'live', 'view_engagement_pct',
+                  'follower_engagement_pct', 'follower_pct', 'small_account']
+
+# Shadow authors want text-friendly reviewers they can reach by email, and
+# smaller accounts that won't expect calls or lives; Open Books want reach
+TYPE_MATCH_WEIGHTS = {
+    AuthorType.SHADOW: {'has_email': 0.35, 'written': 0.25, 'small_account': 0.15,
+                        'follower_engagement_pct': 0.15, 'live': -0.2},
+    AuthorType.CURATED: {'has_email': 0.25, 'view_engagement_pct': 0.25,
+                         'follower_engagement_pct': 0.2, 'follower_pct': 0.1},
+    AuthorType.BRIDGE: {'view_engagement_pct': 0.2, 'follower_pct': 0.2, 'has_email': 0.15,
+                        'audio': 0.1, 'written': 0.05},
+    AuthorType.OPEN_BOOK: {'follower_pct': 0.3, 'view_engagement_pct': 0.2, 'live': 0.15,
+                           'visual': 0.1}
+}
+STYLE_MATCH_WEIGHTS = {
+    InteractionStyle.WRITTEN: {'written': 0.2},
+    InteractionStyle.AUDIO: {'audio': 0.2},
+    InteractionStyle.VISUAL: {'visual': 0.2},
+    InteractionStyle.LIVE: {'live': 0.2}
+}
+GENRE_MATCH_WEIGHT = 0.3
+MATCH_SHORTLIST = 50
+# Personas scored per matrix product; bounds the n × block score matrix
+MATCH_BLOCK = 32
+
+def persona_key(outcome):
+    """(author type, interaction style, genre) for a quiz outcome, by name
+    
+    Names rather than enum members: the enums are redefined on every rerun,
+    while outcomes and shortlists outlive it in the caches.
+    """
+    return (outcome['author_type'].name, outcome['interaction_style'].name, outcome['genre'])
+
+def build_match_features(frame, scores, tags):
+    """Reader feature matrix (float32, one row per reader) and its column names"""
+    text = (frame['bio'].astype(str) + ' ' + frame['hashtags'].map(' '.join).astype(str)).str.lower()
+    columns = {
+        'has_email': scores['has_email'].to_numpy(float),
+        'view_engagement_pct': scores['view_engagement_pct'].to_numpy(float),
+        'follower_engagement_pct': scores['follower_engagement_pct'].to_numpy(float),
+        'follower_pct': scores['follower_pct'].to_numpy(float),
+        'small_account': 1 - scores['follower_pct'].to_numpy(float)
+    }
+    for name, pattern in MATCH_TERMS.items():
+        columns[name] = text.str.contains(pattern, regex=True).to_numpy(float)
+    names = MATCH_FEATURES + [f"genre:{genre}" for genre in GENRE_HASHTAGS]
+    for genre in GENRE_HASHTAGS:
+        columns[f"genre:{genre}"] = genre_mask(frame, tags, genre).astype(float)
+    return np.column_stack([columns[name] for name in names]).astype(np.float32), names
+
+def persona_weights(key, names):
+    """Weight vector over feature `names` for a persona key"""
+    author_type, style, genre = key
+    weights = dict(TYPE_MATCH_WEIGHTS[AuthorType[author_type]])
+    for name, weight in STYLE_MATCH_WEIGHTS[InteractionStyle[style]].items():
+        weights[name] = weights.get(name, 0) + weight
+    weights[f"genre:{(genre or '').lower()}"] = GENRE_MATCH_WEIGHT
+    vector = np.array([weights.get(name, 0.0) for name in names], dtype=np.float32)
+    # Features lie in [0, 1], so the positive weights bound the score:
+    # scale them to sum to 1 for a 0–100 match score like fit_score
+    return vector / max(vector[vector > 0].sum(), 1e-9)
+
+def load_match_features(json_path="arc_readers.json"):
+    store = get_reader_store(json_path)
+    return store.derived('match_features', lambda readers: build_match_features(
+        load_reader_frame(json_path), load_reader_scores(json_path), load_hashtag_index(json_path)))
+
+def match_personas(keys, k=MATCH_SHORTLIST, json_path="arc_readers.json"):
+    """Shortlist (reader positions, scores) for each persona key, best first
+    
+    Shortlists are kept per dataset version, so each persona is scored
+    once until the reader data changes; new personas in a batch are
+    scored together, MATCH_BLOCK at a time.
+    """
+    store = get_reader_store(json_path)
+    with store.pinned():
+        shortlists = store.derived('match_shortlists', lambda readers: {})
+        missing = [key for key in dict.fromkeys(keys) if (key, k) not in shortlists]
+        if missing:
+            features, names = load_match_features(json_path)
+            weights = np.stack([persona_weights(key, names) for key in missing])
+            for start in range(0, len(missing), MATCH_BLOCK):
+                block = features @ weights[start:start + MATCH_BLOCK].T
+                for j, key in enumerate(missing[start:start + MATCH_BLOCK]):
+                    idx = top_k_indices(block[:, j], k)
+                    shortlists[(key, k)] = (idx, block[idx, j])
+        return {key: shortlists[(key, k)] for key in keys}
+
+def match_readers(outcome, k=10, json_path="arc_readers.json"):
+    """Best-matching readers for one quiz outcome"""
+    return match_authors({None: outcome}, k, json_path).drop(columns='author')
+
+def match_authors(authors, k=MATCH_SHORTLIST, json_path="arc_readers.json"):
+    """Shortlists for many authors in one batch: {author id: quiz outcome} -> one DataFrame"""
+    keys = {author: persona_key(outcome) for author, outcome in authors.items()}
+    store = get_reader_store(json_path)
+    with store.pinned():
+        shortlists = match_personas(list(keys.values()), k, json_path)
+        frame = load_reader_frame(json_path)
+    # One gather for the whole batch rather than a frame per author
+    picks = [shortlists[key] for key in keys.values()]
+    idx = np.concatenate([p[0] for p in picks]) if picks else np.array([], dtype=int)
+    out = frame.iloc[idx][['username', 'display_name', 'followers', 'email', 'profile_url']].reset_index(drop=True)
+    out.insert(0, 'author', np.repeat(list(keys), [len(p[0]) for p in picks]))
+    out['match_score'] = np.round(np.clip(np.concatenate([p[1] for p in picks]), 0, 1) * 100, 1) if picks else []
+    return out
+
+# ============================================================================
+# READER ANALYTICS
+# ============================================================================
+
+FOLLOWER_HISTOGRAM_BINS = [0, 100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000, np.inf]
+ENGAGEMENT_HISTOGRAM_BINS = [0, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, np.inf]
+
+def format_count(value):
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:g}M"
+    if value >= 1000:
+        return f"{value / 1000:g}k"
+    return f"{value:g}"
+
+def histogram_frame(values, edges, fmt):
+    """Bin `values` server-side into a small (bin, readers) table"""
+    counts, _ = np.histogram(np.clip(values, edges[0], None), bins=edges)
+    labels = [
+        f"{fmt(lo)}+" if np.isinf(hi) else f"{fmt(lo)}–{fmt(hi)}"
+        for lo, hi in zip(edges[:-1], edges[1:])
+    ]
+    return pd.DataFrame({'bin': labels, 'readers': counts})
+
+def build_reader_analytics(frame, scores, tags):
+    """Aggregate the whole reader set into chart-sized tables and summary numbers"""
+    followers = frame['followers'].to_numpy(float)
+    engagement = scores['view_engagement'].to_numpy(float) * 100
+    has_email = frame['email'].notna().to_numpy()
+    
+    genre_counts = {genre.title() if genre != 'ya' else 'YA': int(genre_mask(frame, tags, genre).sum())
+                    for genre in GENRE_HASHTAGS}
+    any_genre = np.zeros(len(frame), dtype=bool)
+    for genre in GENRE_HASHTAGS:
+        any_genre |= genre_mask(frame, tags, genre)
+    genre_counts['Untagged'] = int((~any_genre).sum())
+    
+    return {
+        'summary': {
+            'readers': len(frame),
+            'median_followers': float(np.median(followers)) if len(frame) else 0.0,
+            'p90_followers': float(np.percentile(followers, 90)) if len(frame) else 0.0,
+            'median_engagement': float(np.median(engagement)) if len(frame) else 0.0,
+            'email_share': float(has_email.mean()) if len(frame) else 0.0
+        },
+        'followers': histogram_frame(followers, FOLLOWER_HISTOGRAM_BINS, format_count),
+        'engagement': histogram_frame(engagement, ENGAGEMENT_HISTOGRAM_BINS, lambda v: f"{v:g}%"),
+        'tiers': (scores['tier'].value_counts().reindex(FOLLOWER_TIER_LABELS, fill_value=0)
+                  .rename_axis('tier').reset_index(name='readers')),
+        'genres': pd.DataFrame({'genre': list(genre_counts), 'readers': list(genre_counts.values())}),
+        'email': pd.DataFrame({'email': ['Has email', 'No email'],
+                               'readers': [int(has_email.sum()), int((~has_email).sum())]})
+    }
+
+def load_reader_analytics(json_path="arc_readers.json"):
+    store = get_reader_store(json_path)
+    return store.derived('analytics', lambda readers: build_reader_analytics(
+        load_reader_frame(json_path), load_reader_scores(json_path), load_hashtag_index(json_path)
+    ))
+
+# ============================================================================
+# DELTA EXPORTS
+# ============================================================================
+# Each consumer (a CRM sync, a mailing tool) keeps its own watermark, so an
+# export only carries readers added or changed since that consumer's last one.
+
+EXPORT_DIR = os.environ.get('BOOKTOK_EXPORT_DIR', 'exports')
+EXPORT_PART_ROWS = 50000
+# What counts as "since the last export"; values are readers table columns
+DELTA_BASES = {
+    'New or changed readers': 'updated_at',
+    'New readers only': 'first_seen'
+}
+# The change sequence behind each basis: timestamps are for people, but
+# wall clocks differ between writers and jump, so exports resume by sequence
+DELTA_SEQUENCES = {
+    'updated_at': 'changed_seq',
+    'first_seen': 'created_seq'
+}
+EXPORT_COLUMNS = ['username', 'display_name', 'followers', 'following', 'videos', 'hearts',
+                  'email', 'hashtags', 'profile_url', 'first_seen', 'updated_at']
+
+def get_export_watermark(consumer, basis='updated_at', json_path="arc_readers.json"):
+    """(watermark, rows) of `consumer`'s last export, or None before the first"""
+    conn = open_reader_db(reader_db_path(json_path))
+    try:
+        return conn.execute(
+            'SELECT watermark, rows FROM export_watermarks WHERE consumer = ? AND basis = ?',
+            (consumer, basis)
+        ).fetchone()
+    finally:
+        conn.close()
+
+def reset_export_watermark(consumer, basis='updated_at', json_path="arc_readers.json"):
+    """Forget `consumer`'s watermark so its next export is a full one"""
+    conn = open_reader_db(reader_db_path(json_path))
+    try:
+        with conn:
+            conn.execute('DELETE FROM export_watermarks WHERE consumer = ? AND basis = ?',
+                         (consumer, basis))
+    finally:
+        conn.close()
+
+def write_export_part(rows, path):
+    """One gzip CSV part from (record, first_seen, updated_at) rows"""
+    readers = []
+    for record, first_seen, updated_at in rows:
+        reader = json.loads(record)
+        reader['first_seen'], reader['updated_at'] = first_seen, updated_at
+        readers.append(reader)
+    frame = build_reader_frame(readers)
+    frame['first_seen'] = [r['first_seen'] for r in readers]
+    frame['updated_at'] = [r['updated_at'] for r in readers]
+    frame['hashtags'] = frame['hashtags'].str.join(' ')
+    frame[EXPORT_COLUMNS].to_csv(path, index=False, compression='gzip')
+
+def export_reader_delta(consumer, basis='updated_at', json_path="arc_readers.json",
+                        out_dir=EXPORT_DIR, part_rows=EXPORT_PART_ROWS):
+    """Export readers past `consumer`'s watermark as gzip CSV parts, then advance it
+    
+    Parts go to <out_dir>/<consumer>/<timestamp>/part-NNNNN.csv.gz with a
+    manifest.json. The directory only appears once every part is written,
+    and the watermark moves after that, so a failed export is simply
+    repeated next time. Returns (directory or None, rows, parts).
+    """
+    if basis not in DELTA_BASES.values():
+        raise ValueError(f"Unknown delta basis: {basis}")
+    if not re.fullmatch(r'\w[\w.-]*', consumer or ''):
+        raise ValueError("Consumer names may only use letters, digits, '.', '_' and '-'")
+    
+    sequence = DELTA_SEQUENCES[basis]
+    conn = open_reader_db(reader_db_path(json_path))
+    try:
+        row = conn.execute(
+            'SELECT sequence, watermark FROM export_watermarks WHERE consumer = ? AND basis = ?',
+            (consumer, basis)
+        ).fetchone()
+        since, since_time = (row[0] or 0, row[1]) if row else (0, None)
+        # A single statement reads one snapshot, so a concurrent ingest can't
+        # split the delta; anything it commits later gets a higher sequence
+        # number and lands in the next export
+        cursor = conn.execute(
+            f'SELECT record, first_seen, updated_at, {sequence}, {basis} FROM readers '
+            f'WHERE {sequence} > ? ORDER BY {sequence}',
+            (since,)
+        )
+        
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        final_dir = os.path.join(out_dir, consumer, stamp)
+        os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(final_dir), prefix='.tmp-')
+        total, parts, last_seq, watermark = 0, 0, since, since_time
+        try:
+            while True:
+                rows = cursor.fetchmany(part_rows)
+                if not rows:
+                    break
+                write_export_part([r[:3] for r in rows],
+                                  os.path.join(work_dir, f"part-{parts:05d}.csv.gz"))
+                total += len(rows)
+                parts += 1
+                last_seq = rows[-1][3]
+                watermark = max(watermark or '', max(r[4] for r in rows))
+            if total:
+                with open(os.path.join(work_dir, 'manifest.json'), 'w') as f:
+                    json.dump({'consumer': consumer, 'basis': basis, 'since': since_time,
+                               'watermark': watermark, 'since_sequence': since, 'sequence': last_seq,
+                               'rows': total, 'parts': parts}, f, indent=2)
+                os.replace(work_dir, final_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if not total:
+            return None, 0, 0
+        
+        with conn:
+            conn.execute(
+                'INSERT INTO export_watermarks (consumer, basis, watermark, rows, exported_at, sequence) '
+                'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (consumer, basis) DO UPDATE SET '
+                'watermark = excluded.watermark, rows = excluded.rows, '
+                'exported_at = excluded.exported_at, sequence = excluded.sequence',
+                (consumer, basis, watermark, total, datetime.now().isoformat(), last_seq)
+            )
+    finally:
+        conn.close()
+    return final_dir, total, parts
+
+def zip_export(export_dir):
+    """An export directory as one zip (parts are already gzipped, so stored as-is)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+        for name in sorted(os.listdir(export_dir)):
+            zf.write(os.path.join(export_dir, name), name)
+    return buffer.getvalue()
+
+# ============================================================================
+# DASHBOARD SUMMARY
+# ============================================================================
+# Headline numbers are worked out once, at the end of each ingest, and kept
+# in a small JSON file next to the dump, so the Dashboard never loads the
+# reader, network or sound data itself.
+
+SUMMARY_HISTORY_DAYS = 84
+
+def summary_path(json_path):
+    return os.path.splitext(json_path)[0] + '.summary.json'
+
+def count_summary(conn, now):
+    """Headline counts straight from the reader database"""
+    week_ago = (now - pd.Timedelta(days=7)).isoformat()
+    two_weeks_ago = (now - pd.Timedelta(days=14)).isoformat()
+    readers, with_email, this_week, last_week = conn.execute('''
+        SELECT COUNT(*),
+               COUNT(json_extract(record, '$.email')),
+               SUM(first_seen >= ?),
+               SUM(first_seen >= ? AND first_seen < ?)
+        FROM readers
+    ''', (week_ago, two_weeks_ago, week_ago)).fetchone()
+    influencers = conn.execute('SELECT COUNT(DISTINCT target) FROM edges').fetchone()[0]
+    sounds = conn.execute('SELECT COUNT(*) FROM sounds').fetchone()[0]
+    
+    pairs = [(tag, genre) for genre, tags in GENRE_HASHTAGS.items() for tag in tags]
+    genres = dict(conn.execute(f'''
+        WITH genre_tags (tag, genre) AS (VALUES {", ".join(["(?, ?)"] * len(pairs))})
+        SELECT g.genre, COUNT(DISTINCT r.username)
+        FROM readers r, json_each(r.record, '$.hashtags') j
+        JOIN genre_tags g ON g.tag = lower(j.value)
+        GROUP BY g.genre
+    ''', [v for pair in pairs for v in pair]).fetchall())
+    
+    return {
+        'readers': readers,
+        'with_email': with_email,
+        'new_this_week': this_week or 0,
+        'new_last_week': last_week or 0,
+        'influencers': influencers,
+        'sounds': sounds,
+        'genres': {genre: genres.get(genre, 0) for genre in GENRE_HASHTAGS}
+    }
+
+def write_summary(json_path, db_path):
+    """Recompute the dashboard summary and append today's counts to its history"""
+    now = pd.Timestamp.now()
+    conn = open_reader_db(db_path)
+    try:
+        summary = count_summary(conn, now)
+    finally:
+        conn.close()
+    
+    previous = read_summary(json_path) or {}
+    today = now.date().isoformat()
+    cutoff = (now - pd.Timedelta(days=SUMMARY_HISTORY_DAYS)).date().isoformat()
+    history = [h for h in previous.get('history', []) if cutoff <= h['date'] < today]
+    history.append({'date': today, **{k: summary[k] for k in ['readers', 'influencers', 'sounds']}})
+    summary['history'] = history
+    summary['generated_at'] = now.isoformat(timespec='seconds')
+    
+    path = summary_path(json_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, path)
+    return summary
+
+def read_summary(json_path="arc_readers.json"):
+    try:
+        with open(summary_path(json_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def week_over_week(summary, key):
+    """Change in `key` since the newest history entry at least a week old, or None"""
+    week_ago = (pd.Timestamp(summary['generated_at']) - pd.Timedelta(days=7)).date().isoformat()
+    older = [h for h in summary.get('history', []) if h['date'] <= week_ago]
+    return summary[key] - older[-1][key] if older else None
+
 # ============================================================================
 # INFLUENCER DISCOVERY (from your database)
 # ============================================================================
@@ -212,108 +2089,547 @@ def get_influencers_by_genre(genre, min_followers=1000):
 # TRENDING SOUNDS DATABASE
 # ============================================================================
 
-@st.cache_data
-def get_trending_sounds(genre=None):
-    """Get trending sounds by genre"""
-    sounds = {
-        'romance': [
-            {'name': 'Cruel Summer - Taylor Swift', 'uses': 45000, 'growth': '+12%'},
-            {'name': 'Enchanted - Taylor Swift', 'uses': 28000, 'growth': '+8%'},
-            {'name': 'I Can Do It With a Broken Heart', 'uses': 22000, 'growth': '+15%'}
-        ],
-        'romantasy': [
-            {'name': 'Enchanted - Taylor Swift', 'uses': 32000, 'growth': '+10%'},
-            {'name': 'I\'m Just a Girl - No Doubt', 'uses': 18000, 'growth': '+20%'},
-            {'name': 'Unholy - Sam Smith', 'uses': 15000, 'growth': '+5%'}
-        ],
-        'thriller': [
-            {'name': 'Murder on the Dancefloor', 'uses': 22000, 'growth': '+25%'},
-            {'name': 'Creep - Radiohead', 'uses': 12000, 'growth': '+8%'},
-            {'name': 'Running Up That Hill', 'uses': 10000, 'growth': '+3%'}
-        ]
+# Hand-maintained fallback for when no scrape dump is available
+TRENDING_SOUNDS_FALLBACK = {
+    'romance': [
+        {'name': 'Cruel Summer - Taylor Swift', 'uses': 45000, 'growth': '+12%'},
+        {'name': 'Enchanted - Taylor Swift', 'uses': 28000, 'growth': '+8%'},
+        {'name': 'I Can Do It With a Broken Heart', 'uses': 22000, 'growth': '+15%'}
+    ],
+    'romantasy': [
+        {'name': 'Enchanted - Taylor Swift', 'uses': 32000, 'growth': '+10%'},
+        {'name': 'I\'m Just a Girl - No Doubt', 'uses': 18000, 'growth': '+20%'},
+        {'name': 'Unholy - Sam Smith', 'uses': 15000, 'growth': '+5%'}
+    ],
+    'thriller': [
+        {'name': 'Murder on the Dancefloor', 'uses': 22000, 'growth': '+25%'},
+        {'name': 'Creep - Radiohead', 'uses': 12000, 'growth': '+8%'},
+        {'name': 'Running Up That Hill', 'uses': 10000, 'growth': '+3%'}
+    ]
+}
+
+TRENDING_CAPACITY = 1000  # Space-Saving counters kept per genre
+TRENDING_TOP = 10
+TRENDING_WINDOW_DAYS = 7
+
+class SpaceSaving:
+    """Approximate top-k counter in bounded memory (Metwally et al. Space-Saving)
+    
+    Keeps at most `capacity` counters; an unseen key replaces the smallest
+    one and inherits its count as the overestimation error.
+    """
+    
+    def __init__(self, capacity=TRENDING_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []  # (count, key), lazily invalidated
+    
+    def add(self, key, count=1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim], self.errors[victim]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, k) for k, c in self.counts.items()]
+            heapq.heapify(self._heap)
+    
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+    
+    def top(self, k=TRENDING_TOP):
+        """[(key, count, error)] for the k largest counters"""
+        best = heapq.nlargest(k, self.counts.items(), key=lambda kv: kv[1])
+        return [(key, count, self.errors[key]) for key, count in best]
+
+class CountMinSketch:
+    """Fixed-size frequency estimator; estimates never undercount"""
+    
+    def __init__(self, width=4096, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+    
+    def _cells(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+    
+    def add(self, key, count=1):
+        self.table[self._rows, self._cells(key)] += count
+    
+    def estimate(self, key):
+        return int(self.table[self._rows, self._cells(key)].min())
+
+def sound_name(item):
+    """'Title - Artist' for the video's music, or None"""
+    music = item.get('musicMeta') or {}
+    name = (music.get('musicName') or '').strip()
+    author = (music.get('musicAuthor') or '').strip()
+    if not name:
+        return None
+    return f"{name} - {author}" if author and author not in name else name
+
+def item_genres(hashtags):
+    tags = {h.lower() for h in hashtags}
+    return [genre for genre, names in GENRE_HASHTAGS.items() if tags.intersection(names)]
+
+def item_timestamp(item):
+    created = item.get('createTime')
+    if created:
+        return float(created)
+    created = item.get('createTimeISO')
+    if created:
+        try:
+            return datetime.fromisoformat(created.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+def format_growth(current, previous):
+    if previous <= 0:
+        return 'new' if current else '0%'
+    return f"{(current - previous) / previous:+.0%}"
+
+def mine_trending(path, as_of=None, capacity=TRENDING_CAPACITY, top=TRENDING_TOP):
+    """One streaming pass over a scrape dump: top hashtags and sounds per genre
+    
+    Space-Saving keeps the heavy-hitter candidates per genre; two Count-Min
+    sketches count this week's and last week's uses for the growth column.
+    Memory is bounded by `capacity` and the sketch size, not the dump.
+    """
+    as_of = as_of or os.path.getmtime(path)
+    window = TRENDING_WINDOW_DAYS * 86400
+    genres = list(GENRE_HASHTAGS) + ['all']
+    hashtag_counters = {g: SpaceSaving(capacity) for g in genres}
+    sound_counters = {g: SpaceSaving(capacity) for g in genres}
+    this_week, last_week = CountMinSketch(), CountMinSketch()
+    
+    for item, _ in iter_scrape_items(path):
+        hashtags = [h.get('name', '') for h in item.get('hashtags', []) if h.get('name')]
+        sound = sound_name(item)
+        created = item_timestamp(item)
+        age = as_of - created if created else None
+        
+        for genre in item_genres(hashtags) + ['all']:
+            for tag in hashtags:
+                hashtag_counters[genre].add(tag.lower())
+            if sound:
+                sound_counters[genre].add(sound)
+                if age is not None and 0 <= age < window:
+                    this_week.add(f"{genre}\0{sound}")
+                elif age is not None and window <= age < 2 * window:
+                    last_week.add(f"{genre}\0{sound}")
+    
+    return {
+        'hashtags': {g: [{'name': tag, 'uses': count} for tag, count, _ in hashtag_counters[g].top(top)]
+                     for g in genres},
+        'sounds': {
+            g: [{
+                'name': sound,
+                'uses': count,
+                'growth': format_growth(this_week.estimate(f"{g}\0{sound}"),
+                                        last_week.estimate(f"{g}\0{sound}"))
+            } for sound, count, _ in sound_counters[g].top(top)]
+            for g in genres
+        }
     }
+
+@st.cache_data(show_spinner="Mining trending sounds...")
+@shared_cached('trending')
+def load_trending(path, identity):
+    """Mined trends for one version of the dump; `identity` keys the cache"""
+    return mine_trending(path)
+
+def get_trending(kind, genre=None, path="arc_readers.json"):
+    identity = file_identity(path)
+    if identity is None:
+        return []
+    return load_trending(path, identity)[kind].get((genre or 'all').lower(), [])
+
+def get_trending_sounds(genre=None, path="arc_readers.json"):
+    """Get trending sounds by genre, mined from the scrape dump when there is one
     
-    if genre and genre.lower() in sounds:
-        return sounds[genre.lower()]
-    return sounds.get('romance', [])
+    The built-in list only stands in when there is no dump; a genre the
+    dump has no sounds for comes back empty rather than with made-up ones.
+    """
+    if file_identity(path) is not None:
+        return get_trending('sounds', genre, path)
+    
+    if genre and genre.lower() in TRENDING_SOUNDS_FALLBACK:
+        return TRENDING_SOUNDS_FALLBACK[genre.lower()]
+    return TRENDING_SOUNDS_FALLBACK.get('romance', [])
+
+def get_trending_hashtags(genre=None):
+    return get_trending('hashtags', genre)
 
 # ============================================================================
 # VIDEO TEMPLATES
 # ============================================================================
 
+# Template definitions are static, so they are built once at import time.
+# Placeholders are the ALL-CAPS bracketed words ([TROPE 1], [BOOK TITLE]);
+# mixed-case brackets ([Point], [Show book cover]) are stage directions.
+VIDEO_TEMPLATES = {
+    'pointing_tropes': {
+        'name': '🎯 Pointing at Tropes',
+        'description': 'Point at different tropes your book includes',
+        'script': """
+        [Point at screen]
+        Looking for [TROPE 1]? ✅
+        [Point]
+        [TROPE 2]? ✅
+        [Point]
+        [TROPE 3]? ✅
+        [Point]
+        Then you need [BOOK TITLE]!
+        """,
+        'visual': 'Pointing hand or finger overlay',
+        'audio': 'Trending sound (any)',
+        'difficulty': 'Easy',
+        'on_camera': False
+    },
+    'books_that_made_me': {
+        'name': '😭 Books That Made Me Feel',
+        'description': 'Show books that evoked strong emotions',
+        'script': """
+        Books that made me [EMOTION] at 2am:
+        
+        [Show book cover]
+        [BOOK TITLE] - because [REASON]
+        
+        Drop your favorite below 👇
+        """,
+        'visual': 'Book covers, flipping pages',
+        'audio': 'Emotional trending sound',
+        'difficulty': 'Easy',
+        'on_camera': False
+    },
+    'if_you_loved': {
+        'name': '📚 If You Loved X, Read Y',
+        'description': 'Compare your book to popular titles',
+        'script': """
+        If you loved [POPULAR BOOK 1] and [POPULAR BOOK 2],
+        you NEED to read [BOOK TITLE].
+        
+        Same [TROPE 1] vibes, plus [UNIQUE ELEMENT].
+        
+        Link in bio! 🔗
+        """,
+        'visual': 'Book covers side by side',
+        'audio': 'Any trending sound',
+        'difficulty': 'Easy',
+        'on_camera': False
+    },
+    'pov': {
+        'name': '🎭 POV: You\'re the Character',
+        'description': 'Act out a scene from your book',
+        'script': """
+        POV: You're [CHARACTER NAME] when [KEY MOMENT].
+        
+        [Act out or show scene]
+        
+        [BOOK TITLE] is out now! ✨
+        """,
+        'visual': 'Acting or text overlay',
+        'audio': 'Dramatic sound',
+        'difficulty': 'Medium',
+        'on_camera': True
+    }
+}
+
+PLACEHOLDER_PATTERN = re.compile(r'\[([A-Z][A-Z0-9 ]*)\]')
+TROPE_PLACEHOLDER_PATTERN = re.compile(r'TROPE (\d+)$')
+
+class CompiledTemplate:
+    """A video script parsed once into literal text and placeholder nodes"""
+    
+    def __init__(self, template_id, template):
+        self.template_id = template_id
+        self.template = template
+        self.script = textwrap.dedent(template['script']).strip()
+        
+        # Alternating ('text', str) / ('slot', NAME) nodes
+        self.nodes = []
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(self.script):
+            if match.start() > pos:
+                self.nodes.append(('text', self.script[pos:match.start()]))
+            self.nodes.append(('slot', match.group(1)))
+            pos = match.end()
+        if pos < len(self.script):
+            self.nodes.append(('text', self.script[pos:]))
+        
+        self.fields = []
+        for kind, value in self.nodes:
+            if kind == 'slot' and value not in self.fields:
+                self.fields.append(value)
+        
+        trope_slots = [int(m.group(1)) for m in map(TROPE_PLACEHOLDER_PATTERN.match, self.fields) if m]
+        self.trope_count = max(trope_slots) if trope_slots else 0
+    
+    def render(self, values):
+        """Fill placeholders from `values`; unknown ones stay as [NAME]"""
+        parts = []
+        for kind, value in self.nodes:
+            if kind == 'text':
+                parts.append(value)
+            elif values.get(value):
+                parts.append(str(values[value]))
+            else:
+                parts.append(f"[{value}]")
+        return ''.join(parts)
+
+@st.cache_resource
+def get_compiled_templates():
+    """Templates compiled once per process (the script itself reruns on every click)"""
+    return {tid: CompiledTemplate(tid, t) for tid, t in VIDEO_TEMPLATES.items()}
+
 def get_video_templates(genre, author_type):
     """Get video templates tailored to genre and author comfort level"""
     
-    templates = {
-        'pointing_tropes': {
-            'name': '🎯 Pointing at Tropes',
-            'description': 'Point at different tropes your book includes',
-            'script': f"""
-            [Point at screen]
-            Looking for [TROPE 1]? ✅
-            [Point]
-            [TROPE 2]? ✅
-            [Point]
-            [TROPE 3]? ✅
-            [Point]
-            Then you need [BOOK TITLE]!
-            """,
-            'visual': 'Pointing hand or finger overlay',
-            'audio': 'Trending sound (any)',
-            'difficulty': 'Easy'
-        },
-        'books_that_made_me': {
-            'name': '😭 Books That Made Me Feel',
-            'description': 'Show books that evoked strong emotions',
-            'script': f"""
-            Books that made me [EMOTION] at 2am:
-            
-            [Show book cover]
-            [BOOK TITLE] - because [REASON]
-            
-            Drop your favorite below 👇
-            """,
-            'visual': 'Book covers, flipping pages',
-            'audio': 'Emotional trending sound',
-            'difficulty': 'Easy'
-        },
-        'if_you_loved': {
-            'name': '📚 If You Loved X, Read Y',
-            'description': 'Compare your book to popular titles',
-            'script': f"""
-            If you loved [POPULAR BOOK 1] and [POPULAR BOOK 2],
-            you NEED to read [BOOK TITLE].
-            
-            Same [TROPE 1] vibes, plus [UNIQUE ELEMENT].
-            
-            Link in bio! 🔗
-            """,
-            'visual': 'Book covers side by side',
-            'audio': 'Any trending sound',
-            'difficulty': 'Easy'
-        },
-        'pov': {
-            'name': '🎭 POV: You\'re the Character',
-            'description': 'Act out a scene from your book',
-            'script': f"""
-            POV: You're [CHARACTER NAME] when [KEY MOMENT].
-            
-            [Act out or show scene]
-            
-            [BOOK TITLE] is out now! ✨
-            """,
-            'visual': 'Acting or text overlay',
-            'audio': 'Dramatic sound',
-            'difficulty': 'Medium'
-        }
+    # Filter templates based on author type
+    # Shadow authors get text-only templates
+    shadow = author_type == AuthorType.SHADOW
+    
+    return {
+        tid: dict(compiled.template, script=compiled.script)
+        for tid, compiled in get_compiled_templates().items()
+        if not (shadow and compiled.template['on_camera'])
     }
+
+def book_placeholder_values(book, tropes):
+    """Map a book record onto template placeholder names"""
+    values = {}
+    for key, value in book.items():
+        if key != 'tropes' and value:
+            values[key.upper().replace('_', ' ')] = value
+    if book.get('title'):
+        values['BOOK TITLE'] = book['title']
+    for i, trope in enumerate(tropes, 1):
+        values[f'TROPE {i}'] = trope
+    return values
+
+def generate_scripts(books, author_type=None, template_ids=None):
+    """Yield a filled script for every book × trope combination × template
     
-    # Filter templates based on author type
-    if author_type == AuthorType.SHADOW:
-        # Shadow authors get text-only templates
-        return {k: v for k, v in templates.items() if 'pov' not in k}
+    Each book is a dict with 'title', a 'tropes' list and optional extra
+    fields named after placeholders (e.g. 'emotion', 'character_name').
+    """
+    templates = [
+        compiled for tid, compiled in get_compiled_templates().items()
+        if (template_ids is None or tid in template_ids)
+        and not (author_type == AuthorType.SHADOW and compiled.template['on_camera'])
+    ]
+    
+    for book_id, book in enumerate(books):
+        tropes = [t for t in book.get('tropes', []) if t]
+        for compiled in templates:
+            if compiled.trope_count and len(tropes) >= compiled.trope_count:
+                trope_sets = itertools.combinations(tropes, compiled.trope_count)
+            else:
+                trope_sets = [tuple(tropes[:compiled.trope_count])]
+            for trope_set in trope_sets:
+                yield {
+                    'book_id': book_id,
+                    'book': book.get('title', ''),
+                    'template': compiled.template_id,
+                    'tropes': list(trope_set),
+                    'script': compiled.render(book_placeholder_values(book, trope_set))
+                }
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'untitled'
+
+def write_scripts(scripts, out_dir):
+    """Stream generated scripts to one text file per book, returning counts per file name
     
-    return templates
+    Files are named after the title; books whose titles slugify alike
+    ("Love & War", "Love War", or blank titles) get -2, -3, ... suffixes.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    names = {}
+    handle, current = None, None
+    try:
+        for item in scripts:
+            book = item.get('book_id', item['book'])
+            if book != current:
+                if handle:
+                    handle.close()
+                current = book
+                # Append so a book split across the stream stays in one file
+                mode = 'a' if book in names else 'w'
+                if book not in names:
+                    slug = slugify(item['book'])
+                    name, n = f"{slug}.txt", 1
+                    while name in counts:
+                        n += 1
+                        name = f"{slug}-{n}.txt"
+                    names[book] = name
+                    counts[name] = 0
+                handle = open(os.path.join(out_dir, names[book]), mode, encoding='utf-8')
+            counts[names[book]] += 1
+            handle.write(f"=== {VIDEO_TEMPLATES[item['template']]['name']}")
+            if item['tropes']:
+                handle.write(f" ({', '.join(item['tropes'])})")
+            handle.write(f" ===\n{item['script']}\n\n")
+    finally:
+        if handle:
+            handle.close()
+    return counts
+
+def parse_book_catalog(df):
+    """Turn an uploaded book catalog (CSV with a ';'-separated tropes column) into book dicts"""
+    books = []
+    for row in df.fillna('').to_dict('records'):
+        book = {str(k).strip().lower().replace(' ', '_'): str(v).strip() for k, v in row.items()}
+        book['tropes'] = [t.strip() for t in book.get('tropes', '').split(';') if t.strip()]
+        books.append(book)
+    return books
+
+# ============================================================================
+# PERSONA OUTCOME CATALOG
+# ============================================================================
+
+ANSWER_LETTERS = ['A', 'B', 'C', 'D']
+
+INTERACTION_STYLES = {
+    'A': InteractionStyle.WRITTEN,
+    'B': InteractionStyle.AUDIO,
+    'C': InteractionStyle.VISUAL,
+    'D': InteractionStyle.LIVE
+}
+
+SOCIAL_BATTERY_OPTIONS = {
+    "Low (need recovery time)": SocialBattery.LOW,
+    "Medium (flexible)": SocialBattery.MEDIUM,
+    "High (energized by people)": SocialBattery.HIGH
+}
+
+QUIZ_GENRES = ["Romance", "Romantasy", "Fantasy", "Thriller", "YA", "Memoir", "Other"]
+
+TYPE_ICONS = {
+    AuthorType.SHADOW: "🖤",
+    AuthorType.CURATED: "💎",
+    AuthorType.BRIDGE: "🌉",
+    AuthorType.OPEN_BOOK: "📖"
+}
+
+PATH_RECOMMENDATIONS = {
+    AuthorType.SHADOW: "Focus on written content. Text-only videos. Let the app handle outreach.",
+    AuthorType.CURATED: "Planned, edited content. Batch create. Schedule everything.",
+    AuthorType.BRIDGE: "Mix of formats. Podcasts + occasional video. Find what feels good.",
+    AuthorType.OPEN_BOOK: "Live videos, events, personality-driven content. You're the brand."
+}
+
+def build_outcome(q1, q2, q3, q4, q5, q6):
+    """Everything the results page shows for one combination of Q1–Q6
+    
+    Enums are stored by name: the catalog outlives the script run, but the
+    enum classes are redefined on every rerun, so members from the first
+    run would never compare equal to later ones. resolve_outcome() maps
+    them back onto the current classes.
+    """
+    persona = AuthorPersona()
+    visibility_score = persona.calculate_visibility({'q1': q1, 'q2': q2, 'q3': q3})
+    author_type = persona.get_author_type()
+    
+    return {
+        'author_type': author_type.name,
+        'visibility_score': visibility_score,
+        'icon': TYPE_ICONS[author_type],
+        'interaction_style': INTERACTION_STYLES[q4].name,
+        'social_battery': SOCIAL_BATTERY_OPTIONS[q5].name,
+        'battery': q5,
+        'genre': q6,
+        'recommendation': PATH_RECOMMENDATIONS[author_type]
+    }
+
+QUIZ_ANSWER_KEYS = ['q1', 'q2', 'q3', 'q4', 'q5', 'q6']
+
+# The questions both quizzes ask, by meaning: (key here, key in Author_Persona.py)
+SHARED_QUIZ_QUESTIONS = {
+    'identity': ('q1', 'q1'),
+    'camera': ('q2', 'q2'),
+    'social_setting': ('q3', 'q3'),
+    'expression': ('q4', 'q4'),
+    'social_battery': ('q5', 'q5')
+}
+
+def compile_outcome_catalog():
+    """Outcomes for every possible Q1–Q6 answer (4 × 4 × 4 × 4 × 3 × 7 combinations)"""
+    return {
+        answers: build_outcome(*answers)
+        for answers in itertools.product(ANSWER_LETTERS, ANSWER_LETTERS, ANSWER_LETTERS, ANSWER_LETTERS,
+                                         SOCIAL_BATTERY_OPTIONS, QUIZ_GENRES)
+    }
+
+@st.cache_resource
+def get_quiz_outcome_catalog():
+    """The outcome catalog, compiled once per process rather than on every rerun"""
+    return compile_outcome_catalog()
+
+def resolve_outcome(outcome):
+    """A catalog outcome with its enum names resolved against this run's classes"""
+    return dict(outcome,
+                author_type=AuthorType[outcome['author_type']],
+                interaction_style=InteractionStyle[outcome['interaction_style']],
+                social_battery=SocialBattery[outcome['social_battery']])
+
+def lookup_outcome(answers):
+    return resolve_outcome(
+        get_quiz_outcome_catalog()[tuple(answers[q] for q in QUIZ_ANSWER_KEYS)])
+
+def find_catalog_mismatches():
+    """Exhaustively compare this catalog with Author_Persona.py's
+    
+    Questions are paired by meaning through SHARED_QUIZ_QUESTIONS, not by
+    number. The two social battery scales differ, so answers are paired
+    when they map to the same SocialBattery level. Every pairing must give
+    the same author type, visibility score, icon and interaction style.
+    Returns a list of human-readable differences (empty when consistent).
+    """
+    import Author_Persona
+    
+    ours_by_answers = {}
+    for answers, outcome in compile_outcome_catalog().items():
+        named = dict(zip(QUIZ_ANSWER_KEYS, answers))
+        shared = {meaning: named[key] for meaning, (key, _) in SHARED_QUIZ_QUESTIONS.items()}
+        shared['social_battery'] = outcome['social_battery']
+        # Genre is only asked here and doesn't change anything compared below
+        ours_by_answers.setdefault(tuple(sorted(shared.items())), resolve_outcome(outcome))
+    
+    mismatches, paired = [], 0
+    for answers, other in Author_Persona.compile_outcome_catalog().items():
+        named = dict(zip(['q1', 'q2', 'q3', 'q4', 'q5'], answers))
+        shared = {meaning: named[key] for meaning, (_, key) in SHARED_QUIZ_QUESTIONS.items()}
+        shared['social_battery'] = other['social_battery'].name
+        ours = ours_by_answers.get(tuple(sorted(shared.items())))
+        if ours is None:
+            mismatches.append(f"{''.join(answers[:4])}/{answers[4]}: no matching answer in TikTok.py")
+            continue
+        paired += 1
+        label = ''.join(answers[:4]) + f"/{other['social_battery'].name}"
+        for field in ['author_type', 'interaction_style']:
+            if ours[field].value != other[field].value:
+                mismatches.append(f"{label}: {field} {ours[field].value!r} != {other[field].value!r}")
+        for field in ['visibility_score', 'icon']:
+            if ours[field] != other[field]:
+                mismatches.append(f"{label}: {field} {ours[field]!r} != {other[field]!r}")
+    if not paired:
+        mismatches.append("no answers could be paired between the two quizzes")
+    return sorted(set(mismatches))
 
 # ============================================================================
 # QUIZ RENDERING (from your existing code, simplified)
@@ -365,6 +2681,17 @@ def render_quiz():
             )
             
             q3 = st.radio(
+                "**At a party, you're most likely to be found:**",
+                options=[
+                    "A) In a quiet corner talking to one person",
+                    "B) Circulating, but needing breaks",
+                    "C) In the middle of a great conversation",
+                    "D) Working the room, meeting everyone"
+                ],
+                index=None
+            )
+            
+            q4 = st.radio(
                 "**Your natural communication style:**",
                 options=[
                     "A) Written word (emails, posts)",
@@ -375,65 +2702,46 @@ def render_quiz():
                 index=None
             )
             
-            q4 = st.select_slider(
+            q5 = st.select_slider(
                 "**Your social battery:**",
-                options=[
-                    "Low (need recovery time)",
-                    "Medium (flexible)",
-                    "High (energized by people)"
-                ],
+                options=list(SOCIAL_BATTERY_OPTIONS),
                 value=None
             )
             
-            q5 = st.selectbox(
+            q6 = st.selectbox(
                 "**Your primary genre:**",
-                options=[
-                    "Romance", "Romantasy", "Fantasy", 
-                    "Thriller", "YA", "Memoir", "Other"
-                ],
+                options=QUIZ_GENRES,
                 index=None
             )
             
             submitted = st.form_submit_button("See My Results", type="primary")
             
             if submitted:
-                if None in [q1, q2, q3, q4, q5]:
+                if None in [q1, q2, q3, q4, q5, q6]:
                     st.error("Please answer all questions")
                 else:
                     st.session_state.answers = {
-                        'q1': q1[0], 'q2': q2[0], 'q3': q3[0],
-                        'q4': q4, 'q5': q5
+                        'q1': q1[0], 'q2': q2[0], 'q3': q3[0], 'q4': q4[0],
+                        'q5': q5, 'q6': q6
                     }
                     st.session_state.quiz_complete = True
                     st.rerun()
 
 def render_results():
     """Display quiz results"""
-    persona = AuthorPersona()
-    visibility_score = persona.calculate_visibility(st.session_state.answers)
-    author_type = persona.get_author_type()
-    
-    # Map interaction style
-    q3_map = {'A': InteractionStyle.WRITTEN, 'B': InteractionStyle.AUDIO,
-              'C': InteractionStyle.VISUAL, 'D': InteractionStyle.LIVE}
-    interaction = q3_map[st.session_state.answers['q3']]
+    # One lookup into the precompiled outcome catalog
+    outcome = lookup_outcome(st.session_state.answers)
+    author_type = outcome['author_type']
     
     st.balloons()
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        colors = {
-            AuthorType.SHADOW: "🖤",
-            AuthorType.CURATED: "💎",
-            AuthorType.BRIDGE: "🌉",
-            AuthorType.OPEN_BOOK: "📖"
-        }
-        
         st.markdown(f"""
         <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 20px; color: white;">
-            <h1 style="font-size: 4rem;">{colors[author_type]}</h1>
+            <h1 style="font-size: 4rem;">{outcome['icon']}</h1>
             <h2>{author_type.value}</h2>
-            <p>Visibility: {visibility_score:.1f}/4.0</p>
+            <p>Visibility: {outcome['visibility_score']:.1f}/4.0</p>
         </div>
         """, unsafe_allow_html=True)
     
@@ -442,19 +2750,22 @@ def render_results():
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("### 📊 Your Profile")
-        st.markdown(f"**Style:** {interaction.value}")
-        st.markdown(f"**Battery:** {st.session_state.answers['q4']}")
-        st.markdown(f"**Genre:** {st.session_state.answers['q5']}")
+        st.markdown(f"**Style:** {outcome['interaction_style'].value}")
+        st.markdown(f"**Battery:** {outcome['battery']}")
+        st.markdown(f"**Genre:** {outcome['genre']}")
     
     with col2:
         st.markdown("### 🎯 Your Path")
-        recs = {
-            AuthorType.SHADOW: "Focus on written content. Text-only videos. Let the app handle outreach.",
-            AuthorType.CURATED: "Planned, edited content. Batch create. Schedule everything.",
-            AuthorType.BRIDGE: "Mix of formats. Podcasts + occasional video. Find what feels good.",
-            AuthorType.OPEN_BOOK: "Live videos, events, personality-driven content. You're the brand."
-        }
-        st.info(recs[author_type])
+        st.info(outcome['recommendation'])
+    
+    st.markdown("### 📚 Matched ARC Readers")
+    st.caption(f"Readers who suit a {author_type.value} author with a "
+               f"{outcome['interaction_style'].value.lower()} style, in {outcome['genre']}")
+    matches = match_readers(outcome)
+    if len(matches):
+        st.dataframe(matches, use_container_width=True, hide_index=True)
+    else:
+        st.info("No readers loaded yet")
     
     if st.button("Start Over"):
         for key in ['quiz_started', 'quiz_complete', 'answers']:
@@ -462,6 +2773,225 @@ def render_results():
                 del st.session_state[key]
         st.rerun()
 
+# ============================================================================
+# PAGE FRAGMENTS
+# ============================================================================
+# Interactive regions rerun on their own (st.fragment): changing a filter or
+# clicking a card's button reruns just that function, not the sidebar and the
+# rest of the page. Fragments load their inputs from the process-wide caches
+# themselves, since main() does not run on a fragment rerun.
+
+LIVE_PREVIEW_ROWS = 100
+LIVE_REFRESH_SECONDS = 1
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_reader_preview():
+    """Best readers ingested so far, refreshed as batches land during the first load"""
+    store = get_reader_store()
+    if not store.loading:
+        # Done: rerun the whole page to bring in the filters and full table
+        st.rerun()
+    with store.pinned() as (_, _, readers):
+        done, total, items = store.progress or (0, 0, 0)
+        st.progress(min(done / total, 1.0) if total else 0.0,
+                    text=f"Loading: {len(readers):,} readers found in {items:,} videos so far")
+        if readers:
+            st.caption(f"Top {LIVE_PREVIEW_ROWS} so far by fit score; filters appear once loading finishes")
+            df = rank_readers(k=LIVE_PREVIEW_ROWS, network=False)
+            st.dataframe(
+                df[['username', 'display_name', 'followers', 'tier', 'engagement_rate', 'fit_score', 'email']],
+                use_container_width=True,
+                hide_index=True
+            )
+
+@st.fragment
+def arc_reader_table():
+    """ARC reader filters and the ranked table they drive"""
+    # Filters
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        min_followers = st.slider("Min followers", 0, 50000, 1000)
+    with col2:
+        has_email = st.checkbox("Has email only")
+    with col3:
+        genre_filter = st.selectbox(
+            "Genre",
+            ["All", "Romance", "Romantasy", "Fantasy", "Thriller", "YA"]
+        )
+    with col4:
+        top_k = st.number_input("Show top", min_value=10, max_value=5000, value=100, step=10)
+    rank_by = st.radio("Rank by", ["Fit score", "Network influence"], horizontal=True,
+                       help="Network influence: PageRank over mentions, duets and stitches between creators")
+    
+    with get_reader_store().pinned():
+        # Filter data (frame, masks and ranking all from one dataset version)
+        frame = load_reader_frame()
+        mask = frame['followers'].to_numpy() >= min_followers
+        if has_email:
+            mask &= frame['email'].notna().to_numpy()
+        genre = None if genre_filter == "All" else genre_filter
+        if genre:
+            mask &= genre_mask(frame, load_hashtag_index(), genre)
+        
+        advanced = st.text_input(
+            "Advanced filter",
+            placeholder='followers between 2k and 50k AND hashtags has romantasy AND bio contains "ARC" AND avg_comments > 10',
+            help="Fields: " + ", ".join(NUMERIC_FILTER_FIELDS + TEXT_FILTER_FIELDS + ['hashtags'])
+                 + ". Combine with AND, OR, NOT and parentheses."
+        )
+        if advanced.strip():
+            try:
+                mask &= filter_readers(advanced)
+            except ValueError as e:
+                st.error(f"Filter error: {e}")
+        
+        # Display as dataframe, best fit first
+        if mask.any():
+            st.caption(f"Showing the top {min(top_k, int(mask.sum())):,} of {int(mask.sum()):,} "
+                       f"matching readers by {rank_by.lower()}")
+            by = 'influence' if rank_by == "Network influence" else 'fit_score'
+            df = rank_readers(genre, top_k, mask, by=by)
+            df = df[['avatar', 'username', 'display_name', 'followers', 'tier', 'engagement_rate',
+                     'fit_score', 'influence', 'email', 'hashtags']]
+            st.dataframe(
+                with_avatar_images(df),
+                use_container_width=True,
+                hide_index=True,
+                column_config={'avatar': st.column_config.ImageColumn("", width="small")}
+            )
+            
+            # Every matching reader (the CRM syncs from this), not just the top K;
+            # only built when asked for, as the table reruns on every filter change
+            if st.button("Prepare CSV export"):
+                export = select_readers(mask, genre)
+                st.download_button(
+                    "📥 Download as CSV",
+                    export[df.columns.drop('avatar')].to_csv(index=False),
+                    "arc_readers.csv",
+                    "text/csv"
+                )
+        else:
+            st.info("No readers match your filters")
+
+@st.fragment
+def similar_readers_panel():
+    """Lookalike search from one reader that worked well"""
+    st.markdown("### 🔎 Readers Like This One")
+    like_username = st.text_input("Username of a reader who worked well for you")
+    if like_username:
+        try:
+            with st.spinner("Building similarity index..."):
+                similar = find_similar_readers(like_username.lstrip('@'), k=20)
+        except KeyError:
+            st.warning(f"@{like_username.lstrip('@')} is not in the reader database")
+        except ValueError as e:
+            st.info(str(e))
+        else:
+            if len(similar):
+                st.dataframe(
+                    similar[['username', 'display_name', 'followers', 'similarity', 'email', 'hashtags']],
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("No readers share hashtags or bio terms with this one")
+
+@st.fragment
+def delta_export_panel():
+    """Per-consumer incremental export of the reader database"""
+    with st.expander("🔄 Delta export for CRM sync"):
+        if file_identity("arc_readers.json") is None:
+            st.info("Delta exports need a scraped arc_readers.json")
+            return
+        st.caption("Each consumer gets only the readers added or changed since its last export, "
+                   "as gzip CSV parts.")
+        col1, col2 = st.columns(2)
+        with col1:
+            consumer = st.text_input("Consumer", value="crm")
+        with col2:
+            basis = DELTA_BASES[st.radio("Include", list(DELTA_BASES), horizontal=True)]
+        
+        try:
+            last = get_export_watermark(consumer, basis) if consumer else None
+        except sqlite3.Error as e:
+            st.error(f"Reader database unavailable: {e}")
+            return
+        if last:
+            st.markdown(f"Last export: {last[1]:,} readers, up to `{last[0]}`")
+        else:
+            st.markdown("No export yet for this consumer: the first one includes every reader.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            run_export = st.button("Export changes", type="primary")
+        with col2:
+            if last and st.button("Reset watermark"):
+                reset_export_watermark(consumer, basis)
+                st.rerun()
+        if run_export:
+            try:
+                export_dir, rows, parts = export_reader_delta(consumer, basis)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            if not rows:
+                st.info("Nothing new since the last export")
+                return
+            st.success(f"Exported {rows:,} readers in {parts} part(s) to {export_dir}")
+            st.download_button(
+                "📥 Download export",
+                zip_export(export_dir),
+                f"{consumer}_{os.path.basename(export_dir)}.zip",
+                "application/zip"
+            )
+
+@st.fragment
+def influencer_card(inf):
+    """One influencer's stats and outreach button"""
+    with st.expander(f"@{inf['username']} - {inf['followers']:,} followers"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"**Engagement:** {inf['engagement']}%")
+            st.markdown(f"**Genres:** {', '.join(inf['genres'])}")
+        with col2:
+            st.markdown(f"**Accepts indies:** {'✅' if inf['accepts_indies'] else '❌'}")
+            st.markdown(f"**Rate:** {inf['rate']}")
+        
+        if st.button(f"📤 Send Outreach", key=inf['username']):
+            st.success(f"Outreach template copied for @{inf['username']}")
+
+@st.fragment
+def sound_row(sound):
+    """One trending sound and its save button"""
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        st.markdown(f"**{sound['name']}**")
+    with col2:
+        st.markdown(f"{sound['uses']:,} uses")
+    with col3:
+        st.markdown(f"📈 {sound['growth']}")
+    
+    if st.button(f"Use This Sound", key=sound['name']):
+        st.success(f"Sound saved to your library")
+
+@st.fragment
+def template_card(tid, template):
+    """One video template with its Use/Preview buttons"""
+    with st.expander(f"{template['name']} - {template['difficulty']}"):
+        st.markdown(f"**{template['description']}**")
+        st.markdown("**Script:**")
+        st.code(template['script'])
+        st.markdown(f"**Visual:** {template['visual']}")
+        st.markdown(f"**Audio:** {template['audio']}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button(f"Use This Template", key=tid):
+                st.session_state['selected_template'] = template
+                st.success("Template selected! Go to Creator Studio")
+        with col2:
+            st.button("Preview", key=f"preview_{tid}")
+
 # ============================================================================
 # MAIN APP
 # ============================================================================
@@ -473,12 +3003,15 @@ def main():
     # Navigation
     page = st.sidebar.radio(
         "Go to:",
-        ["🏠 Dashboard", "👤 Author Quiz", "📚 ARC Readers", "🎯 Influencers", 
+        ["🏠 Dashboard", "👤 Author Quiz", "📚 ARC Readers", "📈 Analytics", "🎯 Influencers", 
          "🎵 Trending Sounds", "📝 Video Templates", "📊 Your Campaigns"]
     )
     
-    # Load data
-    arc_readers = load_arc_readers()
+    reader_store = get_reader_store()
+    if reader_store.progress:
+        done, total, items = reader_store.progress
+        st.sidebar.progress(min(done / total, 1.0) if total else 0.0,
+                            text=f"Ingesting new scrape: {items:,} videos")
     
     # ========================================================================
     # DASHBOARD PAGE
@@ -487,17 +3020,47 @@ def main():
         st.title("📱 Your BookTok Machine")
         st.markdown("### Welcome to your personalized marketing dashboard")
         
-        # Quick stats
+        # Quick stats, from the snapshot written at the end of each ingest
+        summary = read_summary()
+        if summary is None:
+            # Starts the first ingest in the background if nothing has yet
+            reader_store.current()
+            if reader_store.loading:
+                st.info("Loading the reader database: numbers appear once it finishes")
         col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("ARC Readers", f"{len(arc_readers)}+", "+50 this week")
-        with col2:
-            st.metric("Influencers", "3,200+", "+124")
-        with col3:
-            st.metric("Trending Sounds", "47", "+12")
+        if summary:
+            influencers_delta = week_over_week(summary, 'influencers')
+            sounds_delta = week_over_week(summary, 'sounds')
+            with col1:
+                st.metric("ARC Readers", f"{summary['readers']:,}",
+                          f"+{summary['new_this_week']:,} this week "
+                          f"({summary['new_last_week']:,} last week)")
+            with col2:
+                st.metric("Influencers", f"{summary['influencers']:,}",
+                          f"{influencers_delta:+,} this week" if influencers_delta is not None else None,
+                          help="Creators that other creators mention, duet or stitch")
+            with col3:
+                st.metric("Sounds Tracked", f"{summary['sounds']:,}",
+                          f"{sounds_delta:+,} this week" if sounds_delta is not None else None)
+        else:
+            with col1:
+                if reader_store.loading:
+                    st.metric("ARC Readers", "—")
+                else:
+                    st.metric("ARC Readers", f"{len(get_sample_arc_readers())}", "sample data")
+            with col2:
+                st.metric("Influencers", "—")
+            with col3:
+                st.metric("Sounds Tracked", "—")
         with col4:
             st.metric("Your Videos", "0", "Start today")
         
+        if summary and summary['readers']:
+            genres = pd.DataFrame({'genre': list(summary['genres']), 'readers': list(summary['genres'].values())})
+            st.markdown("#### ARC readers by genre")
+            st.caption(f"{summary['with_email']:,} readers list an email · updated {summary['generated_at']}")
+            st.plotly_chart(px.bar(genres, x='genre', y='readers'), use_container_width=True)
+        
         st.markdown("---")
         
         # Getting started
@@ -545,41 +3108,65 @@ def main():
     # ========================================================================
     elif page == "📚 ARC Readers":
         st.title("📚 ARC Reader Database")
-        st.markdown(f"### {len(arc_readers)} readers found")
+        arc_readers = load_arc_readers()
         
-        # Filters
-        col1, col2, col3 = st.columns(3)
+        if reader_store.loading:
+            live_reader_preview()
+        else:
+            st.markdown(f"### {len(arc_readers)} readers found")
+            arc_reader_table()
+            
+            delta_export_panel()
+            
+            st.markdown("---")
+            similar_readers_panel()
+    
+    # ========================================================================
+    # ANALYTICS PAGE
+    # ========================================================================
+    elif page == "📈 Analytics":
+        st.title("📈 Reader Analytics")
+        
+        # Everything below is pre-binned on the server, so the browser only
+        # receives a few dozen rows however large the reader database is
+        analytics = load_reader_analytics()
+        summary = analytics['summary']
+        
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            min_followers = st.slider("Min followers", 0, 50000, 1000)
+            st.metric("Readers", f"{summary['readers']:,}")
         with col2:
-            has_email = st.checkbox("Has email only")
+            st.metric("Median followers", f"{summary['median_followers']:,.0f}",
+                      f"p90 {summary['p90_followers']:,.0f}", delta_color="off")
         with col3:
-            genre_filter = st.selectbox(
-                "Genre",
-                ["All", "Romance", "Romantasy", "Fantasy", "Thriller", "YA"]
-            )
+            st.metric("Median engagement", f"{summary['median_engagement']:.1f}%")
+        with col4:
+            st.metric("Email coverage", f"{summary['email_share']:.0%}")
         
-        # Filter data
-        filtered = [r for r in arc_readers if r['followers'] >= min_followers]
-        if has_email:
-            filtered = [r for r in filtered if r['email']]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### Followers")
+            st.plotly_chart(px.bar(analytics['followers'], x='bin', y='readers'),
+                            use_container_width=True)
+        with col2:
+            st.markdown("#### Engagement rate (interactions / views)")
+            st.plotly_chart(px.bar(analytics['engagement'], x='bin', y='readers'),
+                            use_container_width=True)
         
-        # Display as dataframe
-        if filtered:
-            df = pd.DataFrame(filtered)
-            df = df[['username', 'display_name', 'followers', 'email', 'hashtags']]
-            st.dataframe(df, use_container_width=True)
-            
-            # Download button
-            csv = df.to_csv(index=False)
-            st.download_button(
-                "📥 Download as CSV",
-                csv,
-                "arc_readers.csv",
-                "text/csv"
-            )
-        else:
-            st.info("No readers match your filters")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.markdown("#### Genre mix")
+            st.plotly_chart(px.bar(analytics['genres'], x='genre', y='readers'),
+                            use_container_width=True)
+        with col2:
+            st.markdown("#### Follower tiers")
+            st.plotly_chart(px.bar(analytics['tiers'], x='tier', y='readers'),
+                            use_container_width=True)
+        with col3:
+            st.markdown("#### Email coverage")
+            email = analytics['email']
+            st.plotly_chart(go.Figure(go.Pie(labels=email['email'], values=email['readers'], hole=0.5)),
+                            use_container_width=True)
     
     # ========================================================================
     # INFLUENCERS PAGE
@@ -593,17 +3180,18 @@ def main():
         influencers = get_influencers_by_genre(genre)
         
         for inf in influencers:
-            with st.expander(f"@{inf['username']} - {inf['followers']:,} followers"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown(f"**Engagement:** {inf['engagement']}%")
-                    st.markdown(f"**Genres:** {', '.join(inf['genres'])}")
-                with col2:
-                    st.markdown(f"**Accepts indies:** {'✅' if inf['accepts_indies'] else '❌'}")
-                    st.markdown(f"**Rate:** {inf['rate']}")
-                
-                if st.button(f"📤 Send Outreach", key=inf['username']):
-                    st.success(f"Outreach template copied for @{inf['username']}")
+            influencer_card(inf)
+        
+        st.markdown("---")
+        st.markdown("### 🕸️ Reach in the BookTok Network")
+        network = top_network_creators()
+        if len(network):
+            st.caption("Ranked by PageRank over mentions, duets and stitches in the scrape: "
+                       "1.0 is the network average. Creators in the same community mostly "
+                       "interact with each other.")
+            st.dataframe(network, use_container_width=True, hide_index=True)
+        else:
+            st.info("No mentions, duets or stitches in the scraped videos yet")
     
     # ========================================================================
     # TRENDING SOUNDS PAGE
@@ -617,16 +3205,15 @@ def main():
         sounds = get_trending_sounds(genre if genre != 'all' else None)
         
         for sound in sounds:
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.markdown(f"**{sound['name']}**")
-            with col2:
-                st.markdown(f"{sound['uses']:,} uses")
-            with col3:
-                st.markdown(f"📈 {sound['growth']}")
-            
-            if st.button(f"Use This Sound", key=sound['name']):
-                st.success(f"Sound saved to your library")
+            sound_row(sound)
+        if not sounds:
+            st.info("No sounds in the scrape for this genre yet")
+        
+        hashtags = get_trending_hashtags(genre if genre != 'all' else None)
+        if hashtags:
+            st.markdown("---")
+            st.markdown("### #️⃣ Trending Hashtags")
+            st.markdown(" ".join(f"`#{h['name']}` ({h['uses']:,})" for h in hashtags))
     
     # ========================================================================
     # VIDEO TEMPLATES PAGE
@@ -637,9 +3224,7 @@ def main():
         # Get author type from session if available
         author_type = None
         if st.session_state.get('quiz_complete'):
-            persona = AuthorPersona()
-            persona.calculate_visibility(st.session_state.answers)
-            author_type = persona.get_author_type()
+            author_type = lookup_outcome(st.session_state.answers)['author_type']
         
         genre = st.selectbox("Your genre", 
                             ["Romance", "Romantasy", "Fantasy", "Thriller", "YA"])
@@ -647,20 +3232,34 @@ def main():
         templates = get_video_templates(genre, author_type)
         
         for tid, template in templates.items():
-            with st.expander(f"{template['name']} - {template['difficulty']}"):
-                st.markdown(f"**{template['description']}**")
-                st.markdown("**Script:**")
-                st.code(template['script'])
-                st.markdown(f"**Visual:** {template['visual']}")
-                st.markdown(f"**Audio:** {template['audio']}")
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button(f"Use This Template", key=tid):
-                        st.session_state['selected_template'] = template
-                        st.success("Template selected! Go to Creator Studio")
-                with col2:
-                    st.button("Preview", key=f"preview_{tid}")
+            template_card(tid, template)
+
+        st.markdown("---")
+        st.markdown("### 📦 Bulk Script Generation")
+        st.caption("Upload a CSV with a `title` column, a `tropes` column (separated by `;`) "
+                   "and optional columns named after placeholders, e.g. `emotion`, `character_name`.")
+
+        catalog_file = st.file_uploader("Book catalog", type=["csv"])
+        if catalog_file is not None:
+            books = parse_book_catalog(pd.read_csv(catalog_file))
+            if st.button("Generate Scripts", type="primary"):
+                with tempfile.TemporaryDirectory() as out_dir:
+                    counts = write_scripts(
+                        generate_scripts(books, author_type, template_ids=templates.keys()),
+                        out_dir
+                    )
+                    buffer = io.BytesIO()
+                    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+                        for name in sorted(os.listdir(out_dir)):
+                            zf.write(os.path.join(out_dir, name), name)
+
+                st.success(f"Generated {sum(counts.values()):,} scripts for {len(counts):,} books")
+                st.download_button(
+                    "📥 Download Scripts",
+                    buffer.getvalue(),
+                    "video_scripts.zip",
+                    "application/zip"
+                )
     
     # ========================================================================
     # CAMPAIGNS PAGE
@@ -0,0 +1,213 @@
+# image_cache.py
+# Local disk cache for remote images (sidebar art, reader avatars)
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, UnidentifiedImageError
+
+IMAGE_CACHE_DIR = os.environ.get('BOOKTOK_IMAGE_CACHE', '.cache/images')
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('BOOKTOK_IMAGE_CACHE_MAX_BYTES', 512 * 1024 ** 2))
+THUMBNAIL_SIZE = (160, 160)
+FETCH_TIMEOUT = 10
+PREFETCH_WORKERS = 16
+# Don't retry a failing URL on every rerun while offline
+FAILURE_RETRY_SECONDS = 300
+# Downloads waiting on the background pool; further requests are dropped
+# (pages re-request what they show on every rerun)
+PREFETCH_QUEUE_MAX = 1000
+# Eviction trims to this fraction of max_bytes so directory scans stay rare
+EVICT_TARGET = 0.9
+# Characters left as they are when percent-encoding a URL for the request
+URL_SAFE_CHARS = ":/?#[]@!$&'()*+,;=%~"
+
+class ImageCache:
+    """Remote images stored locally as content-addressed thumbnails
+
+    Each image is downscaled once and written to blobs/<sha256>.jpg, so the
+    same picture behind many URLs is stored once; urls/<sha1 of url> points
+    at its blob. Reads touch the blob's mtime and the least recently used
+    blobs, with the URL entries pointing at them, are evicted once the
+    cache passes `max_bytes`; the size is tracked from writes between
+    scans, so the directory is only listed when it is likely over the limit. Pages only ever read local files,
+    so they keep working offline.
+    """
+
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES,
+                 thumbnail_size=THUMBNAIL_SIZE, timeout=FETCH_TIMEOUT):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.thumbnail_size = thumbnail_size
+        self.timeout = timeout
+        self._failures = {}
+        self._executor = None
+        self._pending = set()
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'urls'), exist_ok=True)
+
+    def _url_path(self, url):
+        return os.path.join(self.directory, 'urls', hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def path_for(self, url):
+        """Local thumbnail for `url` if it is cached, without any network access"""
+        try:
+            with open(self._url_path(url), 'r') as f:
+                blob = os.path.join(self.directory, 'blobs', f.read().strip())
+            os.utime(blob)
+        except OSError:
+            return None
+        return blob
+
+    def fetch(self, url):
+        """Local thumbnail for `url`, downloading it on a miss; None if unavailable"""
+        if not url:
+            return None
+        path = self.path_for(url)
+        if path:
+            return path
+        failed_at = self._failures.get(url)
+        if failed_at and time.time() - failed_at < FAILURE_RETRY_SECONDS:
+            return None
+
+        try:
+            # Raw non-ASCII (e.g. an emoji in the query string) can't go on the wire
+            request_url = urllib.parse.quote(url, safe=URL_SAFE_CHARS)
+            with urllib.request.urlopen(request_url, timeout=self.timeout) as response:
+                data = response.read()
+            thumbnail = self._thumbnail(data)
+        except (urllib.error.URLError, OSError, ValueError, UnidentifiedImageError, Image.DecompressionBombError):
+            self._failures[url] = time.time()
+            return None
+        self._failures.pop(url, None)
+
+        blob_name = hashlib.sha256(thumbnail).hexdigest() + '.jpg'
+        blob = os.path.join(self.directory, 'blobs', blob_name)
+        if not os.path.exists(blob):
+            self._write(blob, thumbnail)
+            self._grow(len(thumbnail))
+        self._write(self._url_path(url), blob_name.encode('utf-8'))
+        return blob
+
+    def _thumbnail(self, data):
+        image = Image.open(io.BytesIO(data))
+        image.thumbnail(self.thumbnail_size)
+        if image.mode != 'RGB':
+            # Flatten transparency onto white; JPEG has no alpha
+            background = Image.new('RGB', image.size, 'white')
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.split()[-1])
+            image = background
+        out = io.BytesIO()
+        image.save(out, format='JPEG', quality=85, optimize=True)
+        return out.getvalue()
+
+    def _write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prefetch(self, urls):
+        """Download every uncached URL in parallel; returns how many are now cached"""
+        missing = [u for u in dict.fromkeys(urls) if u and not self.path_for(u)]
+        if not missing:
+            return 0
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as pool:
+            return sum(1 for path in pool.map(self.fetch, missing) if path)
+
+    def prefetch_async(self, urls):
+        """Queue downloads on a shared background pool without waiting for them
+        
+        URLs already queued are skipped, and at most PREFETCH_QUEUE_MAX wait
+        at a time.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS,
+                                                    thread_name_prefix='image-prefetch')
+        for url in dict.fromkeys(urls):
+            if not url or self.path_for(url):
+                continue
+            with self._lock:
+                if url in self._pending or len(self._pending) >= PREFETCH_QUEUE_MAX:
+                    continue
+                self._pending.add(url)
+            self._executor.submit(self._fetch_pending, url)
+    
+    def _fetch_pending(self, url):
+        try:
+            self.fetch(url)
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def data_uri(self, url):
+        """Cached thumbnail as a data: URI (for dataframe image columns), or None"""
+        path = self.path_for(url)
+        if not path:
+            return None
+        with open(path, 'rb') as f:
+            return 'data:image/jpeg;base64,' + base64.b64encode(f.read()).decode('ascii')
+
+    def _grow(self, nbytes):
+        """Account for a new blob, scanning the directory only once likely over the limit"""
+        with self._lock:
+            if self._size is not None:
+                self._size += nbytes
+            over = self._size is None or self._size > self.max_bytes
+        if over:
+            self.evict()
+    
+    def evict(self):
+        """Drop least recently used blobs, and their URL entries, once the cache passes max_bytes"""
+        blob_dir = os.path.join(self.directory, 'blobs')
+        entries, total = [], 0
+        for name in os.listdir(blob_dir):
+            try:
+                stat = os.stat(os.path.join(blob_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, os.path.join(blob_dir, name)))
+            total += stat.st_size
+        evicted = set()
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TARGET:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    evicted.add(os.path.basename(path))
+                except OSError:
+                    pass
+        with self._lock:
+            self._size = total
+        if evicted:
+            self._drop_urls(evicted)
+    
+    def _drop_urls(self, blob_names):
+        """Remove the URL entries pointing at `blob_names`"""
+        url_dir = os.path.join(self.directory, 'urls')
+        for name in os.listdir(url_dir):
+            path = os.path.join(url_dir, name)
+            try:
+                with open(path, 'r') as f:
+                    if f.read().strip() in blob_names:
+                        os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,375 @@
+# load_test.py
+# Concurrent-session load test for the Streamlit apps, built on AppTest
+#
+#   python load_test.py --sessions 20 --concurrency 8
+#   python load_test.py --journeys persona_quiz --sessions 50
+#   python load_test.py --fragments
+#
+# AppTest keeps its runtime in process-global state, so concurrent sessions
+# run in separate worker processes; point BOOKTOK_CACHE_URL at a shared
+# cache to have them warm each other the way replicas do.
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_TIMEOUT = 60
+
+# ============================================================================
+# SESSION HELPERS
+# ============================================================================
+
+class Session:
+    """One simulated user: an AppTest instance plus its rerun timings"""
+
+    def __init__(self, app_path):
+        self.at = AppTest.from_file(app_path, default_timeout=RUN_TIMEOUT)
+        self.latencies = []
+        self.errors = []
+
+    def run(self):
+        start = time.perf_counter()
+        self.at.run()
+        self.latencies.append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors.append(self.at.exception[0].message)
+        return self.at
+
+    def widget(self, kind, label):
+        """First widget of `kind` whose label contains `label`"""
+        for element in getattr(self.at, kind):
+            if label in (element.label or ''):
+                return element
+        raise LookupError(f"No {kind} labelled {label!r}")
+
+    def wait_for(self, kind, label, timeout=RUN_TIMEOUT):
+        """Rerun (untimed) until a widget appears, e.g. the ARC filters after a cold load"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.widget(kind, label)
+            except LookupError:
+                if time.monotonic() > deadline:
+                    raise
+            time.sleep(0.5)
+            self.at.run()
+    
+    def go_to(self, page):
+        self.widget('radio', 'Go to:').set_value(page)
+        return self.run()
+
+    def click(self, label):
+        self.widget('button', label).click()
+        return self.run()
+
+# ============================================================================
+# JOURNEYS
+# ============================================================================
+
+def quiz_journey(session):
+    """TikTok.py: take the author quiz and read the results"""
+    session.run()
+    session.go_to("👤 Author Quiz")
+    session.click("Start Quiz")
+    for label in ["comfort with being known", "on camera", "At a party", "communication style"]:
+        radio = session.widget('radio', label)
+        radio.set_value(random.choice(radio.options))
+    slider = session.widget('select_slider', 'social battery')
+    slider.set_value(random.choice(slider.options))
+    genre = session.widget('selectbox', 'primary genre')
+    genre.set_value(random.choice(genre.options))
+    session.click("See My Results")
+
+def arc_filter_journey(session):
+    """TikTok.py: scrub the ARC reader filters, then grab the CSV"""
+    session.run()
+    session.go_to("📚 ARC Readers")
+    session.wait_for('slider', 'Min followers')
+    for value in random.sample(range(0, 50001, 2500), 5):
+        session.widget('slider', 'Min followers').set_value(value)
+        session.run()
+    session.widget('checkbox', 'Has email only').check()
+    session.run()
+    genre = session.widget('selectbox', 'Genre')
+    genre.set_value(random.choice(genre.options))
+    session.run()
+    # The CSV is embedded in the page; the download itself never reruns the script
+    session.at.get('download_button')
+
+def template_journey(session):
+    """TikTok.py: browse the video templates and pick some"""
+    session.run()
+    session.go_to("📝 Video Templates")
+    genre = session.widget('selectbox', 'Your genre')
+    for value in random.sample(genre.options, 3):
+        genre.set_value(value)
+        session.run()
+    for button in [b for b in session.at.button if b.label == "Use This Template"][:2]:
+        button.click()
+        session.run()
+
+def outreach_journey(session):
+    """TikTok.py: send influencer outreach and save trending sounds"""
+    session.run()
+    session.go_to("🎯 Influencers")
+    for button in [b for b in session.at.button if 'Send Outreach' in b.label][:3]:
+        button.click()
+        session.run()
+    session.go_to("🎵 Trending Sounds")
+    for button in [b for b in session.at.button if b.label == "Use This Sound"][:3]:
+        button.click()
+        session.run()
+
+def persona_quiz_journey(session):
+    """Author_Persona.py: full quiz, results and the 30-day plan"""
+    session.run()
+    session.click("Start Quiz")
+    for key in ['q1', 'q2', 'q3', 'q4']:
+        radio = session.at.radio(key=key)
+        radio.set_value(random.choice(radio.options))
+    battery = session.at.select_slider(key='q5')
+    battery.set_value(random.choice(battery.options))
+    genre = session.at.selectbox(key='q6')
+    genre.set_value(random.choice(genre.options))
+    goals = session.at.multiselect(key='q7')
+    goals.set_value(random.sample(goals.options, 2))
+    session.click("See My Results")
+    session.click("Generate Detailed Strategy")
+
+JOURNEYS = {
+    'quiz': ('TikTok.py', quiz_journey),
+    'arc_filters': ('TikTok.py', arc_filter_journey),
+    'templates': ('TikTok.py', template_journey),
+    'outreach': ('TikTok.py', outreach_journey),
+    'persona_quiz': ('Author_Persona.py', persona_quiz_journey)
+}
+
+# ============================================================================
+# LOAD RUNNER
+# ============================================================================
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def warm_up(apps):
+    """Worker initializer: pay imports and cold caches once, outside the timings"""
+    main_module = sys.modules['__main__']
+    try:
+        for app in apps:
+            AppTest.from_file(os.path.join(APP_DIR, app), default_timeout=RUN_TIMEOUT).run()
+    finally:
+        sys.modules['__main__'] = main_module
+
+def run_session(name, seed, trace_memory=False):
+    """Run one journey in this worker process; returns plain data for the parent"""
+    random.seed(seed)
+    app, journey = JOURNEYS[name]
+    # Script runs rebind __main__ to the app; the pool needs it back to
+    # unpickle the next task
+    main_module = sys.modules['__main__']
+    if trace_memory:
+        tracemalloc.start()
+    session = Session(os.path.join(APP_DIR, app))
+    try:
+        journey(session)
+    except Exception as e:
+        session.errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        sys.modules['__main__'] = main_module
+    # The session is still alive here, so this is its live footprint
+    memory = None
+    if trace_memory:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return name, session.latencies, session.errors, memory, rss_kb
+
+def run_load_test(journeys, sessions, concurrency, seed=None, trace_memory=False):
+    """Run `sessions` users, each on one journey, `concurrency` at a time
+    
+    tracemalloc gives exact per-session memory but slows every rerun, so it
+    is opt-in; worker peak RSS is always reported.
+    """
+    rng = random.Random(seed)
+    plan = [journeys[i % len(journeys)] for i in range(sessions)]
+    seeds = [rng.randrange(2 ** 32) for _ in plan]
+    apps = sorted({JOURNEYS[name][0] for name in journeys})
+
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=warm_up, initargs=(apps,)) as pool:
+        # Start every worker before the clock does
+        list(pool.map(time.sleep, [0.1] * concurrency))
+        start = time.perf_counter()
+        done = list(pool.map(run_session, plan, seeds, [trace_memory] * len(plan)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [t for _, times, _, _, _ in done for t in times]
+    memory = [m for _, _, _, m, _ in done if m is not None]
+    report = {
+        'sessions': sessions,
+        'concurrency': concurrency,
+        'journeys': journeys,
+        'reruns': len(latencies),
+        'wall_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        'memory_per_session_kb': round(statistics.fmean(memory) / 1024, 1) if memory else None,
+        'max_memory_per_session_kb': round(max(memory) / 1024, 1) if memory else None,
+        'worker_peak_rss_mb': round(max(rss for *_, rss in done) / 1024, 1),
+        'by_journey': {},
+        'errors': [f"{name}: {error}" for name, _, errors, _, _ in done for error in errors]
+    }
+    for name in journeys:
+        times = [t for n, ts, _, _, _ in done if n == name for t in ts]
+        report['by_journey'][name] = {
+            'reruns': len(times),
+            'p50_ms': round(percentile(times, 50) * 1000, 1),
+            'p95_ms': round(percentile(times, 95) * 1000, 1),
+            'p99_ms': round(percentile(times, 99) * 1000, 1)
+        }
+    return report
+
+# ============================================================================
+# FRAGMENT RERUNS
+# ============================================================================
+# AppTest always reruns the whole script, so a fragment rerun is measured as
+# a script that calls just the fragment function: the code Streamlit runs
+# when a widget inside that fragment changes.
+
+FRAGMENT_SCRIPT = '''
+import sys
+sys.path.insert(0, {app_dir!r})
+import TikTok
+{call}
+'''
+
+# name -> (page, fragment call, widget to wait for before timing)
+FRAGMENT_PROBES = {
+    'arc_reader_table': ("📚 ARC Readers", "TikTok.arc_reader_table()", ('slider', 'Min followers')),
+    'influencer_card': ("🎯 Influencers",
+                        "TikTok.influencer_card(TikTok.get_influencers_by_genre('romance')[0])", None),
+    'sound_row': ("🎵 Trending Sounds",
+                  "TikTok.sound_row((TikTok.get_trending_sounds('romance')"
+                  " or TikTok.TRENDING_SOUNDS_FALLBACK['romance'])[0])", None),
+    'template_card': ("📝 Video Templates",
+                      "TikTok.template_card(*next(iter(TikTok.get_video_templates('Romance', None).items())))",
+                      None)
+}
+
+def time_reruns(at, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return times
+
+def run_fragment_benchmark(runs=20):
+    """p50 of a full page rerun against a rerun of each fragment on that page"""
+    main_module = sys.modules['__main__']
+    report = {}
+    try:
+        for name, (page, call, ready) in FRAGMENT_PROBES.items():
+            session = Session(os.path.join(APP_DIR, 'TikTok.py'))
+            session.run()
+            session.go_to(page)
+            if ready:
+                session.wait_for(*ready)
+            full = time_reruns(session.at, runs)
+            
+            probe = AppTest.from_string(FRAGMENT_SCRIPT.format(app_dir=APP_DIR, call=call),
+                                        default_timeout=RUN_TIMEOUT)
+            time_reruns(probe, 1)
+            fragment = time_reruns(probe, runs)
+            report[name] = {
+                'page_p50_ms': round(percentile(full, 50) * 1000, 1),
+                'fragment_p50_ms': round(percentile(fragment, 50) * 1000, 1)
+            }
+    finally:
+        sys.modules['__main__'] = main_module
+    return report
+
+def check_outcome_catalogs():
+    """Preflight: the two quiz implementations must agree on every shared answer"""
+    sys.path.insert(0, APP_DIR)
+    import TikTok
+    return TikTok.find_catalog_mismatches()
+
+def print_report(report):
+    print(f"{report['sessions']} sessions, concurrency {report['concurrency']}, "
+          f"{report['reruns']} reruns in {report['wall_seconds']}s "
+          f"({report['throughput_rps']} reruns/s)")
+    print(f"latency  p50 {report['p50_ms']} ms | p95 {report['p95_ms']} ms | "
+          f"p99 {report['p99_ms']} ms | mean {report['mean_ms']} ms")
+    if report['memory_per_session_kb'] is not None:
+        print(f"memory   {report['memory_per_session_kb']} KB/session mean, "
+              f"{report['max_memory_per_session_kb']} KB max")
+    print(f"workers  {report['worker_peak_rss_mb']} MB peak RSS")
+    for name, stats in report['by_journey'].items():
+        print(f"  {name:<14} {stats['reruns']:>5} reruns  p50 {stats['p50_ms']} ms  "
+              f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms")
+    if report['errors']:
+        print(f"{len(report['errors'])} errors, first: {report['errors'][0]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit apps")
+    parser.add_argument('--journeys', default='quiz,arc_filters,templates',
+                        help=f"comma-separated, from: {', '.join(JOURNEYS)}")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="measure per-session memory with tracemalloc (slows reruns)")
+    parser.add_argument('--fragments', action='store_true',
+                        help="compare full page reruns with fragment reruns instead")
+    parser.add_argument('--json', dest='json_path', help="also write the report to this file")
+    args = parser.parse_args()
+    
+    if args.fragments:
+        report = run_fragment_benchmark()
+        for name, stats in report.items():
+            print(f"{name:<18} page rerun p50 {stats['page_p50_ms']} ms  "
+                  f"fragment rerun p50 {stats['fragment_p50_ms']} ms")
+        if args.json_path:
+            with open(args.json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+        return
+
+    journeys = [j.strip() for j in args.journeys.split(',') if j.strip()]
+    unknown = [j for j in journeys if j not in JOURNEYS]
+    if unknown:
+        parser.error(f"unknown journeys: {', '.join(unknown)}")
+
+    mismatches = check_outcome_catalogs()
+    if mismatches:
+        print(f"{len(mismatches)} persona catalog mismatches between TikTok.py and Author_Persona.py:")
+        for mismatch in mismatches[:20]:
+            print(f"  {mismatch}")
+        sys.exit(1)
+
+    report = run_load_test(journeys, args.sessions, args.concurrency, args.seed, args.trace_memory)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
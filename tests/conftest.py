@@ -0,0 +1,21 @@
+# conftest.py
+# The app is a set of flat scripts in the repository root
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrape_data import scrape_items
+
+@pytest.fixture
+def dump(tmp_path, monkeypatch):
+    """A 200-item arc_readers.json in a scratch working directory"""
+    monkeypatch.chdir(tmp_path)
+    items = scrape_items(200)
+    path = tmp_path / 'arc_readers.json'
+    path.write_text(json.dumps(items, ensure_ascii=False, indent=1), encoding='utf-8')
+    return str(path), items
@@ -0,0 +1,23 @@
+# scrape_data.py
+# Synthetic Apify-style scrape items for the tests
+
+import random
+
+HASHTAGS = ['romance', 'romantasy', 'fantasy', 'thriller', 'booktok', 'arcreader']
+
+def scrape_items(count, seed=0):
+    """Video items with repeat creators and non-ASCII bios (to exercise byte offsets)"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        bio = rng.choice(['', 'ARC reader 📚 reviews@example.com', 'Café reads ✨', 'Send me ARCs'])
+        items.append({
+            'id': str(i),
+            'text': f"video {i}",
+            'authorMeta': {'name': f"reader{i % (count // 2 or 1)}", 'nickName': f"Reader {i}",
+                           'fans': rng.randint(0, 80000), 'signature': bio, 'avatar': ''},
+            'hashtags': [{'name': t} for t in rng.sample(HASHTAGS, rng.randint(0, 3))],
+            'diggCount': rng.randint(0, 500), 'commentCount': rng.randint(0, 40),
+            'shareCount': rng.randint(0, 20), 'playCount': rng.randint(1, 20000)
+        })
+    return items
@@ -0,0 +1,62 @@
+# test_creator_network.py
+# Creator graph: PageRank, communities, and edge extraction at ingest
+
+import json
+
+import numpy as np
+from scipy import sparse
+
+import TikTok
+from scrape_data import scrape_items
+
+def dense_pagerank(weights, damping=TikTok.PAGERANK_DAMPING):
+    """Textbook PageRank: solve r = d M r + (1 - d)/n, dangling rows spread evenly"""
+    n = len(weights)
+    out = weights.sum(axis=1, keepdims=True)
+    transition = np.where(out > 0, weights / np.where(out > 0, out, 1), 1.0 / n).T
+    return np.linalg.solve(np.eye(n) - damping * transition, np.full(n, (1 - damping) / n))
+
+def test_pagerank_matches_dense_reference():
+    rng = np.random.default_rng(7)
+    weights = rng.integers(0, 3, (30, 30)) * (rng.random((30, 30)) < 0.15)
+    np.fill_diagonal(weights, 0)
+    weights[[3, 11]] = 0  # Dangling creators
+    rank = TikTok.pagerank(sparse.csr_matrix(weights.astype(float)))
+    assert np.isclose(rank.sum(), 1)
+    assert np.allclose(rank, dense_pagerank(weights.astype(float)), atol=1e-9)
+    assert len(TikTok.pagerank(sparse.csr_matrix((0, 0)))) == 0
+
+def test_label_propagation_separates_two_cliques():
+    weights = np.zeros((10, 10))
+    weights[:6, :6] = 1
+    weights[6:, 6:] = 1
+    weights[5, 6] = 1  # One weak bridge
+    np.fill_diagonal(weights, 0)
+    labels = TikTok.label_propagation(sparse.csr_matrix(weights))
+    # Largest community first
+    assert labels.tolist() == [0] * 6 + [1] * 4
+
+def test_edges_are_stored_once_per_video(dump):
+    json_path, items = dump
+    items[0]['mentions'] = ['@reader7', 'reader8']
+    items[0]['text'] = "#duet with @reader9 so good"
+    items[1]['detailedMentions'] = [{'name': 'reader7'}]
+    items[2]['text'] = f"#stitch with @{items[2]['authorMeta']['name']}"  # Self: ignored
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+
+    job = TikTok.IngestJob(json_path, batch_size=30).run()
+    edges = TikTok.read_edges(job.db_path)
+    assert sorted(edges.itertuples(index=False, name=None)) == sorted([
+        (items[0]['authorMeta']['name'], 'reader7', 1),
+        (items[0]['authorMeta']['name'], 'reader8', 1),
+        (items[0]['authorMeta']['name'], 'reader9', 1),
+        (items[1]['authorMeta']['name'], 'reader7', 1),
+    ])
+
+    # A newer dump repeating the same videos adds nothing
+    items.extend(scrape_items(4, seed=3))
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+    job = TikTok.IngestJob(json_path, batch_size=30).run()
+    assert TikTok.read_edges(job.db_path)['weight'].sum() == 4
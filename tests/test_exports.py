@@ -0,0 +1,57 @@
+# test_exports.py
+# Delta exports resume from the change sequence, not the wall clock
+
+import gzip
+import json
+from datetime import datetime
+
+import pandas as pd
+
+import TikTok
+
+class EarlierClock(datetime):
+    """A writer whose clock is a day behind the first one"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2000, 1, 1)
+
+def exported_usernames(directory):
+    with open(f"{directory}/manifest.json") as f:
+        parts = json.load(f)['parts']
+    names = []
+    for n in range(parts):
+        with gzip.open(f"{directory}/part-{n:05d}.csv.gz", 'rt', encoding='utf-8') as f:
+            names += pd.read_csv(f)['username'].tolist()
+    return names
+
+def test_delta_export_misses_nothing_when_the_clock_goes_back(dump, tmp_path, monkeypatch):
+    json_path, items = dump
+    TikTok.IngestJob(json_path, batch_size=30).run()
+    _, rows, _ = TikTok.export_reader_delta('crm', json_path=json_path,
+                                                out_dir=str(tmp_path / 'out'), part_rows=40)
+    assert rows == len({i['authorMeta']['name'] for i in items})
+    assert TikTok.export_reader_delta('crm', 'first_seen', json_path, str(tmp_path / 'new'))[1] == rows
+
+    # A newer dump changes ten readers and adds five, ingested by a slow clock
+    changed = [f"reader{n}" for n in range(10)]
+    added = [f"newcomer{n}" for n in range(5)]
+    for item in items:
+        if item['authorMeta']['name'] in changed:
+            item['authorMeta']['fans'] += 1
+    for n, name in enumerate(added):
+        items.append({**items[n], 'id': f"new{n}", 'authorMeta': {**items[n]['authorMeta'], 'name': name}})
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+    monkeypatch.setattr(TikTok, 'datetime', EarlierClock)
+    TikTok.IngestJob(json_path, batch_size=30).run()
+
+    second, rows, _ = TikTok.export_reader_delta('crm', json_path=json_path,
+                                                 out_dir=str(tmp_path / 'out'), part_rows=4)
+    assert sorted(exported_usernames(second)) == sorted(changed + added)
+    new_only, _, _ = TikTok.export_reader_delta('crm', 'first_seen', json_path, str(tmp_path / 'new'))
+    assert sorted(exported_usernames(new_only)) == sorted(added)
+
+    # Nothing left over for either basis
+    assert TikTok.export_reader_delta('crm', 'updated_at', json_path, str(tmp_path / 'out'))[1] == 0
+    assert TikTok.export_reader_delta('crm', 'first_seen', json_path, str(tmp_path / 'new'))[1] == 0
@@ -0,0 +1,52 @@
+# test_filters.py
+# Filter expressions against row-by-row evaluation, and the shared mask cache
+
+import numpy as np
+import pytest
+
+import TikTok
+from scrape_data import scrape_items
+
+FILTER_CASES = {
+    'followers between 2k and 50k AND hashtags has romantasy':
+        lambda r: 2000 <= r['followers'] <= 50000 and 'romantasy' in r['tags'],
+    'bio contains "arc" OR NOT followers > 10k':
+        lambda r: 'arc' in r['bio'].lower() or not r['followers'] > 10000,
+    '(hashtags has romance OR hashtags has #fantasy) AND email exists':
+        lambda r: ('romance' in r['tags'] or 'fantasy' in r['tags']) and isinstance(r['email'], str),
+    'NOT (avg_comments >= 20 AND hashtags has booktok) AND views < 15000':
+        lambda r: not (r['avg_comments'] >= 20 and 'booktok' in r['tags']) and r['views'] < 15000,
+}
+
+def filter_context(readers):
+    frame = TikTok.build_reader_frame(readers)
+    return frame, TikTok.FilterContext(frame, TikTok.build_reader_scores(frame),
+                                       TikTok.build_hashtag_index(frame), TikTok.MaskCache())
+
+def test_filters_match_row_by_row_evaluation():
+    readers = [r for r in map(TikTok.reader_from_item, scrape_items(500, seed=1)) if r]
+    frame, ctx = filter_context(readers)
+    rows = [dict(r, tags={h.lower() for h in r['hashtags']}) for r in frame.to_dict('records')]
+
+    for text, expected in FILTER_CASES.items():
+        node = TikTok.FilterParser(text).parse()
+        want = np.array([expected(r) for r in rows])
+        # Twice: the second pass is answered from the shared mask cache
+        assert (node.mask(ctx) == want).all(), text
+        assert (node.mask(ctx) == want).all(), text
+
+@pytest.mark.parametrize('template', ['followers > {}', 'followers between 0 and {}'])
+def test_thresholds_past_six_digits_get_their_own_masks(template):
+    items = scrape_items(len(range(1234560, 1234580)))
+    for item, fans in zip(items, range(1234560, 1234580)):
+        item['authorMeta'].update(name=f"reader{fans}", fans=fans)
+    _, ctx = filter_context([TikTok.reader_from_item(i) for i in items])
+
+    first = TikTok.FilterParser(template.format(1234567)).parse().mask(ctx)
+    second = TikTok.FilterParser(template.format(1234570)).parse().mask(ctx)
+    assert abs(int(first.sum()) - int(second.sum())) == 3
+
+@pytest.mark.parametrize('text', ['followers >', 'colour contains "red"', '(followers > 5', 'bio "arc"'])
+def test_bad_filters_raise_value_error(text):
+    with pytest.raises(ValueError):
+        TikTok.FilterParser(text).parse()
@@ -0,0 +1,107 @@
+# test_image_cache.py
+# ImageCache against a local HTTP server: fetch, dedup, eviction, prefetch queue
+
+import functools
+import http.server
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+import image_cache
+from image_cache import ImageCache
+
+@pytest.fixture
+def server(tmp_path):
+    """Serves i0.png..i19.png (distinct noise) and same.png (a copy of i0.png)
+
+    Requests wait while `gate` is clear, to hold downloads in the queue.
+    """
+    root = tmp_path / 'www'
+    root.mkdir()
+    for n in range(20):
+        Image.effect_noise((200, 200), 40 + n).convert('RGB').save(root / f"i{n}.png")
+    (root / 'same.png').write_bytes((root / 'i0.png').read_bytes())
+    gate = threading.Event()
+    gate.set()
+    requests = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            gate.wait(10)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                            functools.partial(Handler, directory=str(root)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", gate, requests
+    gate.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_fetch_caches_a_thumbnail(tmp_path, server):
+    base, _, requests = server
+    cache = ImageCache(str(tmp_path / 'cache'))
+    path = cache.fetch(f"{base}/i1.png?caption=📚")
+    assert path and Image.open(path).size == image_cache.THUMBNAIL_SIZE
+    assert cache.path_for(f"{base}/i1.png?caption=📚") == path
+    assert cache.data_uri(f"{base}/i1.png?caption=📚").startswith('data:image/jpeg;base64,')
+    # Cached: no second request
+    assert cache.fetch(f"{base}/i1.png?caption=📚") == path
+    assert len(requests) == 1
+    # Failures are remembered rather than retried on every rerun
+    assert cache.fetch(f"{base}/missing.png") is None
+    assert cache.fetch(f"{base}/missing.png") is None
+    assert len(requests) == 2
+
+def test_same_image_behind_two_urls_is_stored_once(tmp_path, server):
+    base, _, _ = server
+    cache = ImageCache(str(tmp_path / 'cache'))
+    assert cache.fetch(f"{base}/i0.png") == cache.fetch(f"{base}/same.png")
+    assert len(os.listdir(tmp_path / 'cache' / 'blobs')) == 1
+    assert len(os.listdir(tmp_path / 'cache' / 'urls')) == 2
+
+def test_eviction_drops_oldest_blobs_and_their_urls(tmp_path, server):
+    base, _, _ = server
+    probe = ImageCache(str(tmp_path / 'probe'))
+    blob_size = os.path.getsize(probe.fetch(f"{base}/i0.png"))
+    cache = ImageCache(str(tmp_path / 'cache'), max_bytes=blob_size * 5)
+    urls = [f"{base}/i{n}.png" for n in range(12)]
+    for url in urls:
+        assert cache.fetch(url)
+        time.sleep(0.01)  # distinct mtimes for the LRU order
+        # Touched on every read, so the first image stays recent
+        assert cache.path_for(urls[0])
+
+    blobs = os.listdir(tmp_path / 'cache' / 'blobs')
+    assert sum(os.path.getsize(tmp_path / 'cache' / 'blobs' / b) for b in blobs) <= cache.max_bytes
+    assert cache.path_for(urls[0]) and cache.path_for(urls[-1])
+    assert cache.path_for(urls[1]) is None
+    # No URL entry is left pointing at an evicted blob
+    assert len(os.listdir(tmp_path / 'cache' / 'urls')) == len(blobs)
+
+def test_prefetch_queue_is_capped_and_deduplicated(tmp_path, server, monkeypatch):
+    base, gate, requests = server
+    monkeypatch.setattr(image_cache, 'PREFETCH_QUEUE_MAX', 5)
+    cache = ImageCache(str(tmp_path / 'cache'))
+    urls = [f"{base}/i{n}.png" for n in range(10)]
+    gate.clear()
+    cache.prefetch_async(urls)
+    cache.prefetch_async(urls)
+    assert len(cache._pending) == 5
+
+    gate.set()
+    for _ in range(200):
+        if not cache._pending:
+            break
+        time.sleep(0.05)
+    assert sorted(requests) == sorted(f"/i{n}.png" for n in range(5))
+    assert [bool(cache.path_for(u)) for u in urls] == [True] * 5 + [False] * 5
+    # Room again once the queue drains
+    assert cache.prefetch(urls) == 5
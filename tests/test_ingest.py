@@ -0,0 +1,56 @@
+# test_ingest.py
+# Streaming the scrape dump and resuming the SQLite ingest
+
+import json
+
+import pytest
+
+import TikTok
+from scrape_data import scrape_items
+
+@pytest.mark.parametrize('layout', ['array', 'lines'])
+def test_scrape_items_resume_from_any_offset(tmp_path, layout):
+    items = scrape_items(40)
+    path = tmp_path / 'dump.json'
+    if layout == 'array':
+        path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding='utf-8')
+    else:
+        path.write_text('\n'.join(json.dumps(i, ensure_ascii=False) for i in items) + '\n', encoding='utf-8')
+
+    streamed = list(TikTok.iter_scrape_items(str(path), chunk_size=64))
+    assert [item for item, _ in streamed] == items
+    for n, (_, offset) in enumerate(streamed):
+        resumed = [item for item, _ in TikTok.iter_scrape_items(str(path), offset, chunk_size=64)]
+        assert resumed == items[n + 1:]
+
+def test_ingest_resumes_after_crash(dump):
+    json_path, items = dump
+    batches = []
+
+    def crash(batch):
+        batches.append(batch)
+        if len(batches) == 3:
+            raise RuntimeError("worker died")
+
+    with pytest.raises(RuntimeError):
+        TikTok.IngestJob(json_path, batch_size=25, on_batch=crash).run()
+
+    job = TikTok.IngestJob(json_path, batch_size=25).run()
+    assert job.complete
+    assert job.items == len(items)
+    readers = TikTok.read_reader_db(job.db_path)
+    assert sorted(r['username'] for r in readers) == sorted({i['authorMeta']['name'] for i in items})
+
+    # Already complete: nothing is read again
+    assert TikTok.IngestJob(json_path, batch_size=25, on_batch=crash).run().items == len(items)
+
+def test_summary_counts_every_distinct_sound(dump):
+    json_path, items = dump
+    # Each reader posts two videos; only the second one's sound varies
+    for n, item in enumerate(items):
+        item['musicMeta'] = {'musicName': f"Song {n}" if n >= len(items) // 2 else "Shared"}
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+
+    TikTok.IngestJob(json_path, batch_size=30).run()
+    assert TikTok.read_summary(json_path)['sounds'] == len(items) // 2 + 1
@@ -0,0 +1,24 @@
+# test_outcome_catalog.py
+# The two persona quizzes must agree on every answer they share
+
+import TikTok
+
+def test_outcome_catalogs_agree():
+    assert TikTok.find_catalog_mismatches() == []
+
+def test_catalog_check_catches_a_disagreement(monkeypatch):
+    icons = {**TikTok.TYPE_ICONS, TikTok.AuthorType.SHADOW: "👻"}
+    monkeypatch.setattr(TikTok, 'TYPE_ICONS', icons)
+    mismatches = TikTok.find_catalog_mismatches()
+    assert mismatches and all('icon' in m for m in mismatches)
+
+def test_visibility_comes_from_the_party_question_not_communication_style():
+    quiet = TikTok.build_outcome('A', 'A', 'A', 'D', 'Low (need recovery time)', 'Romance')
+    assert quiet['author_type'] == 'SHADOW'
+    assert quiet['interaction_style'] == 'LIVE'
+
+def test_outcomes_resolve_to_current_enums():
+    outcome = TikTok.resolve_outcome(
+        TikTok.build_outcome('A', 'A', 'A', 'A', 'Low (need recovery time)', 'Romance'))
+    assert outcome['author_type'] is TikTok.AuthorType.SHADOW
+    assert outcome['interaction_style'] is TikTok.InteractionStyle.WRITTEN
@@ -0,0 +1,108 @@
+# test_shared_cache.py
+# DiskCache and RedisCache: TTL expiry, LRU eviction, versioned keys
+
+import os
+import time
+
+import pytest
+
+import TikTok
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+class FakeRedis:
+    """Just the get/set/delete subset RedisCache uses, with SET EX expiry"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise ConnectionError("redis is down")
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        if self.down:
+            raise ConnectionError("redis is down")
+        self.data[key] = (value, self.clock() + ex if ex else None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(TikTok.time, 'time', clock)
+    return clock
+
+@pytest.fixture(params=['disk', 'redis'])
+def backend(request, tmp_path, clock):
+    if request.param == 'disk':
+        return TikTok.DiskCache(str(tmp_path / 'cache'))
+    return TikTok.RedisCache(client=FakeRedis(clock))
+
+def test_entries_expire_after_their_ttl(backend, clock):
+    backend.set('short', {'a': 1}, ttl=60)
+    backend.set('forever', [1, 2], ttl=None)
+    assert backend.get('short') == {'a': 1}
+    clock.now += 59
+    assert backend.get('short') == {'a': 1}
+    clock.now += 2
+    assert backend.get('short', TikTok.MISSING) is TikTok.MISSING
+    clock.now += 10 ** 8
+    assert backend.get('forever') == [1, 2]
+    backend.delete('forever')
+    assert backend.get('forever') is None
+
+def test_unreachable_redis_reads_as_a_miss(clock):
+    client = FakeRedis(clock)
+    cache = TikTok.RedisCache(client=client)
+    cache.set('key', 1)
+    client.down = True
+    assert cache.get('key', 'default') == 'default'
+    cache.set('key', 2)  # Dropped, not raised
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = TikTok.DiskCache(str(tmp_path / 'cache'), max_bytes=10 ** 9)
+    cache.set('probe', b'x' * 1000)
+    entry_size = os.path.getsize(cache._path('probe'))
+    cache.delete('probe')
+    cache = TikTok.DiskCache(str(tmp_path / 'cache'), max_bytes=entry_size * 5)
+    for n in range(12):
+        cache.set(f"k{n}", b'x' * 1000)
+        # Read on every step, so k0 stays the most recently used
+        assert cache.get('k0') is not None
+        time.sleep(0.01)
+
+    kept = [n for n in range(12) if cache.get(f"k{n}") is not None]
+    assert 0 in kept and 11 in kept and 1 not in kept
+    assert len(kept) * entry_size <= cache.max_bytes
+
+def test_shared_cached_values_are_dropped_by_a_version_bump(tmp_path, monkeypatch):
+    cache = TikTok.DiskCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(TikTok, 'get_shared_cache', lambda: cache)
+    calls = []
+
+    @TikTok.shared_cached('square', ignore=('on_progress',))
+    def square(x, on_progress=None):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9 and square(3, on_progress=print) == 9
+    assert square(4) == 16
+    assert calls == [3, 4]
+
+    monkeypatch.setattr(TikTok, 'CACHE_VERSION', TikTok.CACHE_VERSION + 1)
+    assert square(3) == 9
+    assert calls == [3, 4, 3]
@@ -0,0 +1,26 @@
+# test_trending.py
+# Trending sounds: mined from the dump, built-in list only without one
+
+import json
+
+import TikTok
+
+def test_sounds_come_from_the_dump_when_there_is_one(dump):
+    json_path, items = dump
+    for n, item in enumerate(items):
+        item['hashtags'] = [{'name': 'romance'}] if n % 2 else [{'name': 'thriller'}]
+        if n % 2:
+            item['musicMeta'] = {'musicName': f"Song {n % 3}", 'musicAuthor': 'Band'}
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+
+    romance = TikTok.get_trending_sounds('romance', json_path)
+    assert {s['name'] for s in romance} == {'Song 0 - Band', 'Song 1 - Band', 'Song 2 - Band'}
+    assert sum(s['uses'] for s in romance) == len(items) // 2
+    # The dump has no thriller sounds: empty, not the built-in list
+    assert TikTok.get_trending_sounds('thriller', json_path) == []
+
+def test_built_in_sounds_without_a_dump(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert TikTok.get_trending_sounds('thriller') == TikTok.TRENDING_SOUNDS_FALLBACK['thriller']
+    assert TikTok.get_trending_sounds() == TikTok.TRENDING_SOUNDS_FALLBACK['romance']